@@ -1,22 +1,55 @@
 import json
 import os
+import re
+import threading
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, TypedDict, Literal
+from typing import Dict, List, Optional, TypedDict, Literal, get_args
 from pydantic import BaseModel, Field
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage, ToolMessage
 from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+from langchain_core.utils.json import parse_json_markdown
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from dotenv import load_dotenv, find_dotenv
-from agents.firestore_utils import create_article, create_newsletter_date
+from agents.llm_clients import get_chat_model, get_ollama_model, get_structured_model
+from agents.request_scheduler import classify_error, get_scheduler
+from agents.structured_repair import repair_json, repair_structured_output, word_count
+from agents.local_retrieval import LocalRetriever, PageCache
+from agents.firestore_utils import (
+    create_article, create_newsletter_date, create_article_draft, update_article_content, publish_article,
+)
 import time
 
 load_dotenv(find_dotenv())
 
 # ========================================== TOOL DEFINITIONS ==========================================
 
+# Set by ArticleAgent._tools_node while a tool call runs, retries stop once the call has timed out
+_tool_deadline: ContextVar[Optional[float]] = ContextVar("tool_deadline", default=None)
+
+class TavilyError(Exception):
+    """Error TavilySearch returned instead of raising, with the HTTP status when it names one"""
+
+    def __init__(self, error):
+        super().__init__(str(error))
+        # The Tavily client reports HTTP failures as "Error <status>: <message>"
+        match = re.search(r"\bError:? ([45]\d\d)\b", str(error))
+        self.status_code = int(match.group(1)) if match else None
+
+
+def _tavily_search(tavily_tool, query: str) -> Dict:
+    results = tavily_tool.invoke({"query": query})
+    # TavilySearch catches provider errors and returns them, raise so the scheduler can back off
+    if isinstance(results, dict) and results.get("error"):
+        error = results["error"]
+        # Connection errors and timeouts are classified by their own type
+        if isinstance(error, Exception) and classify_error(error):
+            raise error
+        raise TavilyError(error)
+    return results
+
+
 @tool
 def web_search(query: str) -> str:
     """
@@ -39,7 +72,8 @@ def web_search(query: str) -> str:
             api_key=api_key,
             search_detph="advanced",
         )
-        results = tavily_tool.invoke({"query": query})
+        # The scheduler caps concurrent Tavily requests across every agent in the process
+        results = get_scheduler("tavily").run(lambda: _tavily_search(tavily_tool, query), deadline=_tool_deadline.get())
         
         return json.dumps(results["results"], indent=2)
         
@@ -48,16 +82,34 @@ def web_search(query: str) -> str:
         raise e
 
 
+NO_SOURCES_MESSAGE = "No source articles available for this topic. Use web_search."
+
+
+@tool
+def local_search(query: str) -> str:
+    """
+    Search the RSS articles this topic was built from. Use this before web_search.
+    Args:
+        query: The search query string
+    Returns:
+        JSON string with matching passages containing titles, content, and URLs
+    """
+    # Runs against the topic's retriever in ArticleAgent._tools_node, there is none outside the agent
+    return NO_SOURCES_MESSAGE
+
+
 # ========================================== PYDANTIC SCHEMAS ==========================================
 
 class ArticleSection(BaseModel):
     heading: str
     content: str = Field(description="Content of the section. At least 300 words")
 
+Category = Literal["Technology", "Business", "Science", "Entertainment", "Politics"]
+
 class GeneratedArticle(BaseModel):
     title: str
     subtitle: str 
-    categories: List[Literal["Technology", "Business", "Science", "Entertainment", "Politics"]] = Field(description="List of article categories. Can be a single category.")
+    categories: List[Category] = Field(description="List of article categories. Can be a single category.")
     sections: List[ArticleSection]
     sources: List[str] = Field(default=[])
     groundbreaking: bool = Field(description="Only true if the article is extraordinarily novel or impactful.")
@@ -69,54 +121,199 @@ class AgentState(TypedDict):
     topic: Dict
     messages: List[BaseMessage]
     search_count: int
+    local_search_count: int
     min_search_count: int
     max_search_count: int
+    max_local_search_count: int
+    retriever: Optional[LocalRetriever]
+    research_deadline: float
+    max_research_tokens: int
+    research_tokens: int
+    budget_skipped: bool
+    stop_reason: Optional[str]
+    draft: Optional["ArticleDraft"]
+    published: bool
     final_article: Optional[Dict]
 
+# ========================================== RESEARCH BUDGET ==========================================
+
+class ResearchBudget:
+    """
+    Limits on the research loop. The first limit reached ends research and hands off to `write`.
+    max_search_count caps web searches, local searches over the source articles are capped separately
+    and both count towards min_search_count. A turn whose tool calls were all refused for budget
+    reasons also ends research, the model is only asking for searches it can no longer run.
+    """
+
+    def __init__(self, min_search_count: int = 2, max_search_count: int = 5,
+                 max_research_seconds: float = 180.0, max_research_tokens: int = 30000,
+                 max_local_search_count: int = 6):
+        self.min_search_count = min_search_count
+        self.max_search_count = max_search_count
+        self.max_local_search_count = max_local_search_count
+        self.max_research_seconds = max_research_seconds
+        self.max_research_tokens = max_research_tokens
+
+    def initial_state(self) -> Dict:
+        """State fields that seed a new research loop"""
+        return {
+            "search_count": 0,
+            "local_search_count": 0,
+            "min_search_count": self.min_search_count,
+            "max_search_count": self.max_search_count,
+            "max_local_search_count": self.max_local_search_count,
+            "research_deadline": time.monotonic() + self.max_research_seconds,
+            "max_research_tokens": self.max_research_tokens,
+            "research_tokens": 0,
+            "budget_skipped": False,
+            "stop_reason": None,
+        }
+
+    @staticmethod
+    def exhausted(state: AgentState) -> Optional[str]:
+        """Return the name of the limit that has been reached, or None"""
+        if state["search_count"] >= state["max_search_count"]:
+            return "max_search_count"
+        if state.get("budget_skipped"):
+            return "search_budget"
+        if time.monotonic() >= state["research_deadline"]:
+            return "deadline"
+        if state["research_tokens"] >= state["max_research_tokens"]:
+            return "token_ceiling"
+        return None
+
+# ========================================== STREAMING DRAFT ==========================================
+
+class ArticleDraft:
+    """
+    Progressively persists an article while the writing model streams it.
+    The draft document is created once the header fields are known, every completed
+    section is saved as it arrives and publish() flips the article to published.
+    Readers only see the article once it is published.
+    """
+
+    def __init__(self, article_id: str, date: str):
+        self.article_id = article_id
+        self.date = date
+        self.created = False
+        self.saved_sections = 0
+        self.error: Optional[str] = None
+
+    def update(self, partial: Dict, final: bool = False):
+        """Persist whatever is complete in a partially parsed article"""
+        sections = [
+            section for section in partial.get("sections") or []
+            if isinstance(section, dict) and section.get("heading") and section.get("content")
+        ]
+        # The last section may still be streaming unless the response is finished
+        completed = sections if final else sections[:-1]
+
+        if not self.created:
+            # Header fields precede sections in the schema, so they are complete once sections start
+            if "sections" not in partial:
+                return
+            result = create_article_draft(
+                article_id=self.article_id,
+                title=partial.get("title", ""),
+                subtitle=partial.get("subtitle", ""),
+                categories=[c for c in partial.get("categories") or [] if c in get_args(Category)],
+                date=self.date,
+            )
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+            self.created = True
+            print(f"📝 Draft created: {self.article_id}")
+
+        if len(completed) > self.saved_sections:
+            result = update_article_content(self.article_id, completed)
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+            self.saved_sections = len(completed)
+            print(f"📝 Draft saved with {self.saved_sections} section(s)")
+
+    def save_progress(self, partial: Dict):
+        """update() while streaming: a datastore error stops further saves instead of the stream"""
+        if self.error:
+            return
+        try:
+            self.update(partial)
+        except Exception as e:
+            self.error = str(e)
+            print(f"⚠️ Draft save failed, finishing the article without progressive saves: {e}")
+
+    def publish(self, article: Dict) -> Dict:
+        return publish_article(
+            article_id=self.article_id,
+            title=article.get("title"),
+            subtitle=article.get("subtitle"),
+            categories=article.get("categories"),
+            content=article.get("sections"),
+            sources=article.get("sources"),
+            groundbreaking=article.get("groundbreaking", False),
+        )
+
 # ========================================== REACT AGENT ==========================================
 
 class ArticleAgent:
     """Simple 2-node ReAct Article Agent"""
     
     # The default model can have problems with structured outputs use another model if deployed
-    def __init__(self, api_key: str, research_model: str = "qwen3:8b", writing_model: str = "qwen/qwen3-235b-a22b:free"):
-        self.research_llm = ChatOllama(
-            model=research_model, 
-            temperature=0.3
-        ).bind_tools([web_search])
-
-        self.structured_llm = ChatOpenAI(
-            model=writing_model, 
-            temperature=0.3,
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        ).with_structured_output(GeneratedArticle)
-
-        self.tool_node = ToolNode([web_search])
+    def __init__(self, api_key: str, research_model: str = "qwen3:8b", writing_model: str = "qwen/qwen3-235b-a22b:free",
+                 budget: Optional[ResearchBudget] = None, max_parallel_searches: int = 4,
+                 search_timeout: float = 30.0, stream_write: bool = False,
+                 fallback_writing_model: Optional[str] = os.getenv("OPENROUTER_FALLBACK_MODEL"),
+                 fetch_source_pages: bool = os.getenv("FETCH_SOURCE_PAGES") == "1"):
+        self.budget = budget or ResearchBudget()
+        self.search_timeout = search_timeout
+        self.max_parallel_searches = max_parallel_searches
+        # Calls queued or running on the search pool, including timed-out ones still finishing
+        self._search_backlog = 0
+        self._search_backlog_lock = threading.Lock()
+        self.stream_write = stream_write
+        # Teaser-only feed entries are backed by their cached article page, see agents/local_retrieval.py
+        self.page_cache = PageCache() if fetch_source_pages else None
+
+        # Chat models come from the shared registry so agents reuse pooled connections
+        research_llm = get_ollama_model(research_model, temperature=0.3)
+        self.research_llm = research_llm.bind_tools([web_search])
+        # local_search is only offered for topics that carry source articles
+        self.grounded_research_llm = research_llm.bind_tools([local_search, web_search])
+
+        self.writing_llm = get_chat_model(writing_model, api_key, temperature=0.3)
+        # Raw output is kept so malformed articles can be repaired locally instead of regenerated
+        self.structured_llm = get_structured_model(GeneratedArticle, writing_model, api_key, temperature=0.3, include_raw=True)
+        self.streaming_llm = self.writing_llm.bind(response_format={"type": "json_object"})
+
+        # Used when the writing model stays rate limited after retries
+        self.fallback_structured_llms = []
+        self.fallback_streaming_llms = []
+        if fallback_writing_model:
+            self.fallback_structured_llms.append(
+                get_structured_model(GeneratedArticle, fallback_writing_model, api_key, temperature=0.3, include_raw=True))
+            self.fallback_streaming_llms.append(
+                get_chat_model(fallback_writing_model, api_key, temperature=0.3).bind(response_format={"type": "json_object"}))
+        self.scheduler = get_scheduler("openrouter")
+
+        self.tools = {web_search.name: web_search, local_search.name: local_search}
+        self.search_pool = ThreadPoolExecutor(max_workers=max_parallel_searches, thread_name_prefix="web_search")
         self.graph = self._build_graph()
 
     def _build_graph(self):
         workflow = StateGraph(AgentState)
-        
-        def tools_wrapper(state: AgentState):
-            # Call the tool node properly and update search count
-            result = self.tool_node.invoke(state)
-            result["search_count"] = state["search_count"] + 1
-            print(f"🔍 web_search used — search_count = {result['search_count']}")
-            return result
 
-        workflow.add_node("tools", tools_wrapper)
+        workflow.add_node("tools", self._tools_node)
         workflow.add_node("research", self._research_node)
         workflow.add_node("write", self._write_node)
         
         workflow.set_entry_point("research")
         
-        # Conditional edge: tools if tool calls, otherwise end
+        # Conditional edge: tools if tool calls, back to research if under the minimum, otherwise end
         workflow.add_conditional_edges(
             "research",
             self._should_continue,
             {
                 "tools": "tools",
+                "continue": "research",
                 "end": "write"
             }
         )
@@ -128,6 +325,16 @@ class ArticleAgent:
     def _research_node(self, state: AgentState):
         """Research node - research and write"""
         
+        # The last tool turn may have used up what is left of the budget, end before asking for more
+        state["stop_reason"] = self.budget.exhausted(state)
+        if state["stop_reason"]:
+            return state
+
+        retriever = state.get("retriever")
+        searches_done = state["search_count"] + state["local_search_count"]
+        search_tools = "`local_search` or `web_search`" if retriever else "`web_search`"
+        search_actions = "`Action: local_search[query]`, `Action: web_search[query]`" if retriever else "`Action: web_search[query]`"
+
         if len(state["messages"]) == 0:
             system_prompt = f"""
             You are a professional investigative journalist tasked with deeply researching the following topic.
@@ -137,41 +344,175 @@ class ArticleAgent:
             CATEGORIES: {', '.join(state['topic'].get('categories', []))}
 
             RESEARCH INSTRUCTIONS:
-            - Use the `web_search` tool for each query, specifying precise, targeted searches.
+            - Use the {search_tools} tool for each query, specifying precise, targeted searches.
             - Collect factual data, up-to-date statistics, expert quotes, and credible source URLs.
             - After each search, summarize key findings with a paragraph and list the source URLs.
             - Repeat until you have at least {state['min_search_count']} distinct, high-quality sources.
             - Do not write any full article sections yet—focus exclusively on gathering and organizing research.
 
             STATE:
-            - Searches performed: {state['search_count']} / {state['min_search_count']}
+            - Searches performed: {searches_done} / {state['min_search_count']}
+
+            Begin your research now. Use only `Thought:`, {search_actions}, and `Observation:` tags."""
+
+            start_message = "Start research phase."
+            if retriever:
+                system_prompt += f"""
 
-            Begin your research now. Use only `Thought:`, `Action: web_search[query]`, and `Observation:` tags."""
+            SOURCE ARTICLES:
+            This topic was built from {len(state['topic'].get('rss_entries') or [])} articles we already collected from RSS feeds.
+            - Use the `local_search` tool first, it searches those articles.
+            - Use `web_search` only for facts, context or developments the source articles do not cover."""
+                # Seed the conversation with the best passages so the first turn starts from our own sources
+                start_message += " Passages from the source articles:\n" + retriever.search_json(
+                    f"{state['topic'].get('title', '')} {state['topic'].get('summary', '')}"
+                )
+
+            follow_up_of = state['topic'].get('follow_up_of')
+            if follow_up_of:
+                system_prompt += f"""
+
+            FOLLOW-UP:
+            We already published "{follow_up_of['title']}" on this story. Focus on developments since then."""
 
             state["messages"] = [
                 SystemMessage(content=system_prompt),
-                HumanMessage(content="Start research phase.")
+                HumanMessage(content=start_message)
             ]
+        elif isinstance(state["messages"][-1], AIMessage):
+            # The model stopped searching before reaching the minimum, nudge it to keep going
+            state["messages"].append(HumanMessage(
+                content=f"Searches performed: {searches_done} / {state['min_search_count']}. "
+                        f"Continue researching with the {search_tools} tool."
+            ))
 
         # Get response from LLM
         print("Invoking research llm")
-        response = self.research_llm.invoke(state["messages"])
+        research_llm = self.grounded_research_llm if retriever else self.research_llm
+        response = research_llm.invoke(state["messages"])
         state["messages"].append(response)
 
+        usage = getattr(response, "usage_metadata", None) or {}
+        state["research_tokens"] = state["research_tokens"] + usage.get("total_tokens", 0)
+
+        # Record which limit (if any) ends the loop so _should_continue can route on it
+        state["stop_reason"] = self.budget.exhausted(state)
+        if not state["stop_reason"] and not response.tool_calls and searches_done >= state["min_search_count"]:
+            state["stop_reason"] = "complete"
+
         return state
     
+    def _tools_node(self, state: AgentState):
+        """
+        Run every tool call of the last research turn concurrently on the search pool.
+        Each call gets search_timeout from the moment it starts running, so calls queued
+        behind a full pool are not cut short. Tool messages keep the order of the tool
+        calls, each query that ran counts as one search against the budget of its tool.
+        """
+        tool_calls = state["messages"][-1].tool_calls
+        remaining = {
+            web_search.name: max(state["max_search_count"] - state["search_count"], 0),
+            local_search.name: max(state["max_local_search_count"] - state["local_search_count"], 0),
+        }
+        retriever = state.get("retriever")
+        started: Dict[str, float] = {}
+        skipped = 0
+
+        def run(call: Dict) -> str:
+            started[call["id"]] = time.monotonic()
+            token = _tool_deadline.set(started[call["id"]] + self.search_timeout)
+            try:
+                return self._run_tool_call(call, retriever)
+            finally:
+                _tool_deadline.reset(token)
+                self._search_finished()
+
+        turn_start = time.monotonic()
+        futures = {}
+        positions = {}
+        for call in tool_calls:
+            if call["name"] == local_search.name and not retriever:
+                # Not offered for this topic, answered without running or counting it
+                continue
+            if call["name"] in remaining:
+                if remaining[call["name"]] == 0:
+                    skipped += 1
+                    continue
+                remaining[call["name"]] -= 1
+            # Position in the pool's real backlog, calls left over from earlier turns count too
+            with self._search_backlog_lock:
+                positions[call["id"]] = self._search_backlog
+                self._search_backlog += 1
+            futures[call["id"]] = self.search_pool.submit(run, call)
+
+        tool_messages = []
+        for call in tool_calls:
+            future = futures.get(call["id"])
+            if future is None and call["name"] == local_search.name and not retriever:
+                content = NO_SOURCES_MESSAGE
+            elif future is None:
+                content = "Search budget exhausted, query was not run."
+            else:
+                wave_start = self._wave_start(turn_start, positions[call["id"]])
+                content = self._await_tool_call(call, future, started, wave_start)
+            tool_messages.append(ToolMessage(content=content, tool_call_id=call["id"], name=call["name"]))
+
+        # Calls cancelled before they started do not use up the budget
+        ran = [call["name"] for call in tool_calls if call["id"] in started]
+        state["messages"].extend(tool_messages)
+        state["search_count"] = state["search_count"] + ran.count(web_search.name)
+        state["local_search_count"] = state["local_search_count"] + ran.count(local_search.name)
+        state["budget_skipped"] = bool(tool_calls) and skipped == len(tool_calls)
+        print(f"🔍 web_search used {ran.count(web_search.name)}x, local_search used {ran.count(local_search.name)}x "
+              f"— search_count = {state['search_count']}, local_search_count = {state['local_search_count']}")
+        return state
+
+    def _search_finished(self):
+        with self._search_backlog_lock:
+            self._search_backlog -= 1
+
+    def _wave_start(self, turn_start: float, position: int) -> float:
+        """Latest time a call at `position` in the pool backlog should start, when every wave ahead uses its full timeout"""
+        return turn_start + (position // self.max_parallel_searches) * self.search_timeout
+
+    def _await_tool_call(self, call: Dict, future, started: Dict[str, float], wave_start: float) -> str:
+        """Wait for one tool call, timing it from when it started running"""
+        while True:
+            start = started.get(call["id"], wave_start)
+            try:
+                return future.result(timeout=max(start + self.search_timeout - time.monotonic(), 0))
+            except FutureTimeoutError:
+                # It started since the last check, give it its full timeout from then
+                if started.get(call["id"], wave_start) > start:
+                    continue
+                # Still queued behind hung calls, drop it instead of starting it late
+                if future.cancel():
+                    self._search_finished()
+                return f"Error: {call['name']} timed out after {self.search_timeout:.0f}s"
+            except Exception as e:
+                return f"Error: {e}"
+
+    def _run_tool_call(self, call: Dict, retriever: Optional[LocalRetriever] = None) -> str:
+        if call["name"] == local_search.name:
+            print("local_search called with query: ", call["args"].get("query", ""))
+            return retriever.search_json(call["args"].get("query", ""))
+        selected_tool = self.tools.get(call["name"])
+        if selected_tool is None:
+            return f"Error: unknown tool {call['name']}"
+        return selected_tool.invoke(call["args"])
+
     def _should_continue(self, state: AgentState) -> str:
         """Decide whether to continue searching or end"""
         last_message = state["messages"][-1]
-            
+
+        if state["stop_reason"]:
+            print(f"ending tool loop ({state['stop_reason']})")
+            return "end"
+
         if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
             return "tools"
         
-        if state["search_count"] < state["min_search_count"]:
-            return "tools"
-        
-        print("ending tool loop")
-        return "end"
+        return "continue"
     
     def _write_node(self, state: AgentState):
         system_prompt = f"""
@@ -191,23 +532,175 @@ class ArticleAgent:
         - Use plenty of rich, factual content — each section should be at least 300 words
         - Focus only on writing — do NOT include `Thought:` or `Action:` tags
         """
-        messages = [SystemMessage(content=system_prompt)] + state["messages"]
-        article = self.structured_llm.invoke(messages)
-        state["final_article"] = article.dict()
+        messages = [SystemMessage(content=system_prompt)] + self._strip_pending_tool_calls(state["messages"])
+
+        if state.get("draft"):
+            return self._stream_write(state, messages)
+
+        output = self.scheduler.run(
+            lambda: self.structured_llm.invoke(messages),
+            fallbacks=[lambda llm=llm: llm.invoke(messages) for llm in self.fallback_structured_llms],
+        )
+        article = repair_structured_output(GeneratedArticle, output, defaults=self._article_defaults(state),
+                                           non_empty=("sections",))
+        if article is None:
+            raise ValueError(f"Unusable article output: {output.get('parsing_error')}")
+        article = self._complete_sections(article, messages)
+        if not article.sections:
+            # Never hand an article without a body to the outbox, the topic fails instead
+            raise ValueError("Article has no section content after regeneration")
+        state["final_article"] = article.model_dump()
+        return state
+
+    def _stream_write(self, state: AgentState, messages: List[BaseMessage]):
+        """Stream the article as raw JSON and persist completed sections as they arrive"""
+        draft = state["draft"]
+        partial, error = self.scheduler.run(
+            lambda: self._stream_article(draft, messages, self.streaming_llm),
+            fallbacks=[lambda llm=llm: self._stream_article(draft, messages, llm) for llm in self.fallback_streaming_llms],
+        )
+
+        article = None
+        if not error:
+            article = repair_structured_output(GeneratedArticle, partial, defaults=self._article_defaults(state),
+                                               non_empty=("sections",))
+            error = None if article else "article could not be repaired"
+        if article is not None:
+            article = self._complete_sections(article, messages)
+            error = None if article.sections else "article has no section content"
+        if error:
+            # Completed sections stay in the (hidden) draft, the topic is failed so it can be retried
+            print(f"❌ Streaming write failed after {draft.saved_sections} section(s): {error}")
+            state["final_article"] = {}
+            state["published"] = False
+            return state
+
+        # The article is complete from here on, a datastore error must not lose it
+        article = article.model_dump()
+        state["final_article"] = article
+        try:
+            draft.update(article, final=True)
+            result = draft.publish(article)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        print("Article Publish: ", result)
+        state["published"] = result["success"]
         return state
 
-    def invoke(self, topic: Dict) -> Optional[Dict]:
-        """Create article from topic"""
+    def _stream_article(self, draft: ArticleDraft, messages: List[BaseMessage], llm):
+        """
+        Stream one response, persisting complete sections. Returns (partial article, error).
+        Raises when nothing was persisted yet so the scheduler can retry or fail over.
+        """
+        buffer = ""
+        partial: Dict = {}
+
+        try:
+            for chunk in llm.stream(messages):
+                if not isinstance(chunk.content, str) or not chunk.content:
+                    continue
+                buffer += chunk.content
+                # Sections can only start or complete on a bracket, skip re-parsing otherwise
+                if "[" not in chunk.content and "}" not in chunk.content:
+                    continue
+                try:
+                    parsed = parse_json_markdown(buffer)
+                except Exception:
+                    continue
+                if isinstance(parsed, dict):
+                    partial = parsed
+                    draft.save_progress(partial)
+
+        except Exception as e:
+            # Model error with nothing persisted yet, let the scheduler retry or fail over
+            if not draft.created:
+                raise
+            return partial, str(e)
+
+        # The final chunk may not contain a bracket, parse the whole buffer once more
+        repaired = repair_json(buffer)
+        return (repaired if isinstance(repaired, dict) else partial), None
+
+    @staticmethod
+    def _article_defaults(state: AgentState) -> Dict:
+        """Values for fields the writing model left out or got wrong"""
+        topic = state["topic"]
+        return {
+            "title": topic.get("title", ""),
+            "subtitle": topic.get("summary", "").split(". ")[0],
+            "categories": topic.get("categories") or ["Technology"],
+        }
+
+    def _complete_sections(self, article: GeneratedArticle, messages: List[BaseMessage],
+                           min_words: int = 150, max_regenerations: int = 3) -> GeneratedArticle:
+        """Regenerate only the sections that came back empty or far too short"""
+        regenerated = 0
+        for section in article.sections:
+            if word_count(section.content) >= min_words or regenerated >= max_regenerations:
+                continue
+            regenerated += 1
+            print(f"✏️ Regenerating short section '{section.heading}' ({word_count(section.content)} words)")
+
+            request = HumanMessage(content=(
+                f"Write only the body of the section \"{section.heading}\" of the article \"{article.title}\". "
+                f"The article's sections are: {', '.join(s.heading for s in article.sections)}. "
+                "Write at least 300 words of plain text based on the research above. "
+                "Do not include the heading, JSON, Markdown or any other section."
+            ))
+            try:
+                response = self.scheduler.run(lambda: self.writing_llm.invoke(messages + [request]))
+                content = response.content if isinstance(response.content, str) else ""
+                content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
+            except Exception as e:
+                print(f"    ⚠️ Section regeneration failed: {e}")
+                continue
+            if word_count(content) > word_count(section.content):
+                section.content = content
+
+        article.sections = [section for section in article.sections if section.content.strip()]
+        return article
+
+    @staticmethod
+    def _strip_pending_tool_calls(messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Drop unanswered tool calls from the last message. When the budget ends research
+        the final research turn may still request searches that will never run.
+        """
+        if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+            return messages[:-1] + [AIMessage(content=messages[-1].content or "")]
+        return messages
+
+    def invoke(self, topic: Dict, article_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Create article from topic.
+        In streaming write mode an article_id is required, the article is persisted under
+        that id as it is written and `published` is set in the result once it is finalized.
+        Drafts are hidden from readers, the mode preserves completed sections rather than
+        showing articles sooner. A complete article with `published` False failed to publish
+        and still has to be written, an empty `final_article` means generation failed.
+        """
         try:
+            draft = None
+            if self.stream_write:
+                if not article_id:
+                    raise ValueError("article_id is required when stream_write is enabled")
+                draft = ArticleDraft(article_id, date=str(datetime.now(timezone.utc).date().isoformat()))
+
+            # Research starts from the RSS entries the topic was built from, when it carries them
+            retriever = LocalRetriever(topic.get("rss_entries") or [], page_cache=self.page_cache)
+
             initial_state = {
                 "topic": topic,
                 "messages": [],
+                "retriever": retriever if len(retriever) else None,
                 "final_article": {},
-                "search_count": 0,
-                "min_search_count": 2,
-                "max_search_count": 5,
+                "draft": draft,
+                "published": False,
+                **self.budget.initial_state(),
             }
-            result = self.graph.invoke(initial_state)
+            # The research budget bounds the loop, the recursion limit is only a backstop
+            result = self.graph.invoke(initial_state, {"recursion_limit": 200})
+            print(f"Research ended: {result.get('stop_reason')}")
             return result
             
         except Exception as e:
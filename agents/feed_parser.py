@@ -0,0 +1,223 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, IO, List, Optional
+import feedparser
+import requests
+
+# Two backends turn an RSS/Atom feed into the article dicts used by data_collection_node:
+#   "feedparser" - builds the full feedparser object tree (handles anything, slow on big feeds)
+#   "fast"       - streams the XML with lxml.iterparse, extracts only the fields we use and stops
+#                  after the per-feed limit. Falls back to feedparser for malformed feeds.
+
+FEED_BACKENDS = ("feedparser", "fast")
+
+# Entry fields are matched on qualified names so extension elements with the same local name
+# (media:title, media:description, media:content, ...) never override the core fields
+_RSS1 = "{http://purl.org/rss/1.0/}"
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+
+_ENTRY_TAGS = {"item", _RSS1 + "item", _ATOM + "entry"}
+_FIELD_TAGS = {
+    "title": "title", _RSS1 + "title": "title", _ATOM + "title": "title",
+    "link": "link", _RSS1 + "link": "link", _ATOM + "link": "link",
+    "description": "summary", _RSS1 + "description": "summary", _ATOM + "summary": "summary",
+    _CONTENT + "encoded": "content", _ATOM + "content": "content",
+    "pubDate": "pubDate", _ATOM + "published": "published", _ATOM + "updated": "updated", _DC + "date": "date",
+    "category": "tag", _ATOM + "category": "tag", _DC + "subject": "tag",
+}
+_DATE_TAGS = ("published", "pubDate", "date", "updated")
+
+
+def build_article_data(title: str, link: str, summary: str, source_name: str, category: str,
+                       pub_date: Optional[datetime], tags: List[str]) -> Dict:
+    """Article dict stored in rss_data["rss_feeds"]"""
+    return {
+        "title": title,
+        "link": link,
+        "summary": summary,
+        "source": source_name,
+        "category": category,
+        "published_date": pub_date.isoformat() if pub_date else datetime.now().isoformat(),
+        "tags": tags,
+        "word_count": len(summary.split()) if summary else 0
+    }
+
+
+# ========================================== FEEDPARSER BACKEND ==========================================
+
+def parse_with_feedparser(source, source_name: str, category: str, cutoff_time: datetime, limit: int = 20) -> List[Dict]:
+    """Parse a feed URL or document with feedparser"""
+    feed = feedparser.parse(source)
+    # feedparser reports network, HTTP and XML errors through bozo instead of raising, surface
+    # them so the caller can count the failure (and back off) rather than record an empty success
+    status = feed.get("status")
+    if status is not None and status >= 400:
+        raise RuntimeError(f"HTTP {status} fetching feed")
+    if feed.bozo and not feed.entries:
+        raise feed.bozo_exception
+    articles = []
+
+    for entry in feed.entries[:limit]:
+        try:
+            # Parse publication date
+            pub_date = None
+            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                pub_date = datetime(*entry.published_parsed[:6])
+            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+                pub_date = datetime(*entry.updated_parsed[:6])
+
+            # Skip if too old
+            if pub_date and pub_date < cutoff_time:
+                continue
+
+            # Extract content
+            summary = getattr(entry, 'summary', '')
+            if hasattr(entry, 'content') and entry.content:
+                summary = entry.content[0].value if entry.content else summary
+
+            tags = [tag.get("term") for tag in getattr(entry, 'tags', []) if tag.get("term")]
+            articles.append(build_article_data(entry.title, entry.link, summary, source_name, category, pub_date, tags))
+
+        except Exception as e:
+            print(f"    ⚠️ Error processing entry from {source_name}: {e}")
+            continue
+
+    return articles
+
+
+# ========================================== STREAMING BACKEND ==========================================
+
+def _parse_date(value: str) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) as a naive UTC datetime, matching feedparser"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _entry_fields(element) -> Dict:
+    """Pull title, link, summary, content, dates and categories out of an <item>/<entry>"""
+    fields = {"title": "", "link": "", "summary": "", "content": "", "dates": {}, "tags": []}
+
+    for child in element:
+        name = _FIELD_TAGS.get(child.tag) if isinstance(child.tag, str) else None
+        text = (child.text or "").strip()
+
+        if name == "title":
+            fields["title"] = "".join(child.itertext()).strip()
+        elif name == "link":
+            # Atom links carry the URL in href, prefer the alternate link
+            href = child.get("href")
+            if href and (not fields["link"] or child.get("rel", "alternate") == "alternate"):
+                fields["link"] = href
+            elif text and not fields["link"]:
+                fields["link"] = text
+        elif name == "content":
+            fields["content"] = text or "".join(child.itertext()).strip()
+        elif name == "summary":
+            fields["summary"] = text or "".join(child.itertext()).strip()
+        elif name in _DATE_TAGS:
+            fields["dates"][name] = text
+        elif name == "tag":
+            term = child.get("term") or text
+            if term:
+                fields["tags"].append(term)
+
+    return fields
+
+
+def parse_with_iterparse(stream: IO[bytes], source_name: str, category: str, cutoff_time: datetime,
+                         limit: int = 20) -> List[Dict]:
+    """
+    Incrementally parse an RSS 2.0/RSS 1.0/Atom document from a byte stream.
+    Stops after `limit` entries, or at the first entry older than the cutoff while the
+    feed has been in reverse chronological order. Raises lxml.etree.XMLSyntaxError
+    on malformed XML and ValueError when the document holds no entries.
+    """
+    from lxml import etree
+
+    articles = []
+    seen = 0
+    previous_date: Optional[datetime] = None
+    newest_first = True
+
+    context = etree.iterparse(stream, events=("end",), huge_tree=True, resolve_entities=False)
+    try:
+        for _, element in context:
+            if element.tag not in _ENTRY_TAGS:
+                continue
+
+            seen += 1
+            fields = _entry_fields(element)
+
+            # Free the finished entry and anything before it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            pub_date = None
+            for name in _DATE_TAGS:
+                if fields["dates"].get(name):
+                    pub_date = _parse_date(fields["dates"][name])
+                    if pub_date:
+                        break
+
+            if pub_date:
+                if previous_date and pub_date > previous_date:
+                    newest_first = False
+                previous_date = pub_date
+                if pub_date < cutoff_time:
+                    if newest_first:
+                        break
+                    continue
+
+            if fields["title"]:
+                summary = fields["content"] or fields["summary"]
+                articles.append(build_article_data(
+                    fields["title"], fields["link"], summary, source_name, category, pub_date, fields["tags"]
+                ))
+
+            if seen >= limit:
+                break
+    finally:
+        del context
+
+    if seen == 0:
+        raise ValueError("no RSS items or Atom entries found")
+    return articles
+
+
+# ========================================== ENTRY POINT ==========================================
+
+def fetch_feed_articles(source_name: str, source_info: Dict, cutoff_time: datetime, limit: int = 20,
+                        backend: str = "feedparser", timeout: float = 15.0) -> List[Dict]:
+    """Fetch a source's feed and return its recent entries as article dicts"""
+    if backend not in FEED_BACKENDS:
+        raise ValueError(f"Unknown feed backend {backend}. Must be one of: {', '.join(FEED_BACKENDS)}")
+
+    if backend == "fast":
+        try:
+            with requests.get(source_info["rss"], stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                # Let urllib3 undo gzip/deflate so lxml sees plain XML
+                response.raw.decode_content = True
+                return parse_with_iterparse(response.raw, source_name, source_info["category"], cutoff_time, limit)
+        except ImportError:
+            print("        ⚠️ lxml not installed, using feedparser")
+        except requests.RequestException:
+            raise
+        except Exception as e:
+            print(f"        ⚠️ Fast parse failed for {source_name} ({e}), falling back to feedparser")
+
+    return parse_with_feedparser(source_info["rss"], source_name, source_info["category"], cutoff_time, limit)
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Per-source freshness tracking and polling plan. Every source keeps an EWMA of the
+# observed gap between new entries, the time of its last new entry and its error/latency
+# history. A source is fetched only when it is due: roughly half its typical gap after
+# the last fetch, bounded by min/max intervals, and backed off exponentially while failing.
+
+DEFAULT_STATE_PATH = os.path.join(os.getenv("NEURAL_NEWS_DATA_DIR", ".data"), "feed_state.json")
+
+
+class PollingPlanner:
+    """Decides which feeds to fetch on each cycle from their update history"""
+
+    def __init__(self, state_path: str = DEFAULT_STATE_PATH, min_interval: float = 10 * 60,
+                 max_interval: float = 24 * 3600, max_error_backoff: float = 12 * 3600,
+                 smoothing: float = 0.3, known_links: int = 200):
+        self.state_path = state_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_error_backoff = max_error_backoff
+        self.smoothing = smoothing
+        self.known_links = known_links
+        self.stats: Dict[str, Dict] = self._load()
+
+    # ========================================== PERSISTENCE ==========================================
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"    ⚠️ Could not read feed state, starting fresh: {e}")
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.stats, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _source_stats(self, source_name: str) -> Dict:
+        return self.stats.setdefault(source_name, {
+            "last_fetch": None,
+            "last_new_item": None,
+            "interarrival": None,
+            "latency": None,
+            "consecutive_errors": 0,
+            "last_error": None,
+            "next_due": 0.0,
+            "links": [],
+        })
+
+    # ========================================== PLANNING ==========================================
+
+    def poll_interval(self, source_name: str, source_info: Optional[Dict] = None) -> float:
+        """Seconds between fetches for a healthy source"""
+        stats = self._source_stats(source_name)
+        source_info = source_info or {}
+        min_interval = source_info.get("min_interval_minutes", self.min_interval / 60) * 60
+        max_interval = source_info.get("max_interval_minutes", self.max_interval / 60) * 60
+
+        if stats["interarrival"] is None:
+            return min_interval
+
+        interval = stats["interarrival"] / 2
+        # A feed that has gone quiet for longer than its usual gap is polled less often
+        if stats["last_new_item"] is not None:
+            quiet_for = time.time() - stats["last_new_item"]
+            if quiet_for > stats["interarrival"]:
+                interval = max(interval, quiet_for / 2)
+        return min(max(interval, min_interval), max_interval)
+
+    def due_sources(self, sources: Dict[str, Dict], now: Optional[float] = None) -> Dict[str, Dict]:
+        """Subset of `sources` that should be fetched this cycle"""
+        now = time.time() if now is None else now
+        due = {}
+        for source_name, source_info in sources.items():
+            if self._source_stats(source_name)["next_due"] <= now:
+                due[source_name] = source_info
+        return due
+
+    # ========================================== OBSERVATIONS ==========================================
+
+    def record_success(self, source_name: str, articles: List[Dict], latency: float,
+                       source_info: Optional[Dict] = None) -> int:
+        """Update history after a fetch. Returns the number of entries not seen before."""
+        stats = self._source_stats(source_name)
+        now = time.time()
+
+        known = set(stats["links"])
+        new_articles = [a for a in articles if a.get("link") and a["link"] not in known]
+
+        if new_articles:
+            published = sorted(self._timestamp(a) for a in new_articles)
+            previous = stats["last_new_item"]
+            # Gap samples: between consecutive new entries and from the previous newest entry
+            samples = [b - a for a, b in zip(published, published[1:]) if b > a]
+            if previous is not None and published[-1] > previous:
+                samples.append((published[-1] - previous) / len(new_articles))
+            for sample in samples:
+                stats["interarrival"] = sample if stats["interarrival"] is None else (
+                    self.smoothing * sample + (1 - self.smoothing) * stats["interarrival"]
+                )
+            stats["last_new_item"] = max(published[-1], previous or 0)
+            stats["links"] = (stats["links"] + [a["link"] for a in new_articles])[-self.known_links:]
+
+        stats["latency"] = latency if stats["latency"] is None else (
+            self.smoothing * latency + (1 - self.smoothing) * stats["latency"]
+        )
+        stats["consecutive_errors"] = 0
+        stats["last_error"] = None
+        stats["last_fetch"] = now
+        stats["next_due"] = now + self.poll_interval(source_name, source_info)
+        return len(new_articles)
+
+    def record_failure(self, source_name: str, error: Exception, latency: float,
+                       source_info: Optional[Dict] = None):
+        """Back a failing source off exponentially on top of its normal interval"""
+        stats = self._source_stats(source_name)
+        now = time.time()
+        stats["consecutive_errors"] += 1
+        stats["last_error"] = str(error)
+        stats["last_fetch"] = now
+        backoff = min(self.min_interval * 2 ** stats["consecutive_errors"], self.max_error_backoff)
+        stats["next_due"] = now + max(backoff, self.poll_interval(source_name, source_info))
+
+    @staticmethod
+    def _timestamp(article: Dict) -> float:
+        try:
+            published = datetime.fromisoformat(article["published_date"])
+            # Feed dates are stored as naive UTC
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            return published.timestamp()
+        except (KeyError, TypeError, ValueError):
+            return time.time()
@@ -4,6 +4,9 @@ from firebase_admin import firestore
 from typing import Dict, List, Any, Optional
 import re
 
+# Categories an article may be filed under, matches the article agent's Category literal
+VALID_CATEGORIES = ('Technology', 'Science', 'Entertainment', 'Politics', 'Business')
+
 def increment_newsletter_date():
     """
     Increments the `articleCount` field in a Firestore document
@@ -88,12 +91,11 @@ def create_article(article_id: str, title: str, subtitle: str, categories: List[
     """
     try:
         # Validate category
-        valid_categories = {'Technology', 'Science', 'Entertainment', 'Politics', 'Business'}
         for category in categories:
-            if category not in valid_categories:
+            if category not in VALID_CATEGORIES:
                 return {
                     'success': False,
-                    'error': f'Invalid categories. Must be one of: {", ".join(valid_categories)}'
+                    'error': f'Invalid categories. Must be one of: {", ".join(VALID_CATEGORIES)}'
                 }
         
         # Get current UTC timestamp
@@ -110,7 +112,8 @@ def create_article(article_id: str, title: str, subtitle: str, categories: List[
             'readTime': calculate_read_time(content),
             'views': 0,
             'createdAt': created_at,
-            'groundbreaking': groundbreaking
+            'groundbreaking': groundbreaking,
+            'status': 'published',
         }
         
         # Create document reference using article_id as document ID
@@ -141,6 +144,261 @@ def create_article(article_id: str, title: str, subtitle: str, categories: List[
         }
 
 
+def create_articles_batch(articles: List[Dict[str, Any]]):
+    """
+    Writes several articles, their content subcollections and the newsletter_dates counters
+    in one atomic Firestore batch.
+    
+    Args:
+        articles (List[Dict]): Keyword arguments of create_article() for each article
+    
+    Returns:
+        dict: Result with the written article ids, or the error. Articles with invalid
+            categories are skipped and reported under 'rejected'.
+    """
+    try:
+        created_at = datetime.now(timezone.utc).isoformat()
+
+        batch = db.batch()
+        written, rejected = [], {}
+        date_counts: Dict[str, int] = {}
+
+        for article in articles:
+            invalid = [c for c in article['categories'] if c not in VALID_CATEGORIES]
+            if invalid:
+                rejected[article['article_id']] = f'Invalid categories {invalid}. Must be one of: {", ".join(VALID_CATEGORIES)}'
+                continue
+
+            doc_ref = db.collection('articles').document(article['article_id'])
+            batch.set(doc_ref, {
+                'title': article['title'],
+                'subtitle': article['subtitle'],
+                'categories': article['categories'],
+                'sources': article['sources'],
+                'date': article['date'],
+                'readTime': calculate_read_time(article['content']),
+                'views': 0,
+                'createdAt': created_at,
+                'groundbreaking': article.get('groundbreaking', False),
+                'status': 'published',
+            })
+            batch.set(doc_ref.collection('content').document('main'), {'body': article['content']})
+            date_counts[article['date']] = date_counts.get(article['date'], 0) + 1
+            written.append(article['article_id'])
+
+        for date_str, count in date_counts.items():
+            batch.set(
+                db.collection('newsletter_dates').document(date_str),
+                {'articleCount': firestore.Increment(count)},
+                merge=True
+            )
+
+        if written:
+            batch.commit()
+
+        return {'success': True, 'article_ids': written, 'rejected': rejected}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to write article batch: {str(e)}',
+        }
+
+
+def get_published_article_ids(article_ids: List[str]) -> List[str]:
+    """
+    Returns the subset of article_ids that already exist as published articles.
+    """
+    refs = [db.collection('articles').document(article_id) for article_id in article_ids]
+    return [
+        doc.id for doc in db.get_all(refs)
+        if doc.exists and is_published(doc.to_dict())
+    ]
+
+
+def create_article_draft(article_id: str, title: str, subtitle: str, categories: List[str], date: str):
+    """
+    Creates a draft document under articles/[article_id] with an empty content subcollection.
+    Sections are filled in with update_article_content() and the article is finalized by publish_article().
+    
+    Args:
+        article_id (str): Unique identifier for the article
+        title (str): Article title
+        subtitle (str): Article subtitle/summary
+        categories (List[str]): Article category (Technology | Science | Entertainment | Politics | Business)
+        date (str): Article date in YYYY-MM-DD format
+    
+    Returns:
+        dict: Result containing success status or error
+    """
+    try:
+        now_utc = datetime.now(timezone.utc)
+
+        doc_data = {
+            'title': title,
+            'subtitle': subtitle,
+            'categories': categories,
+            'sources': [],
+            'date': date,
+            'readTime': 60,
+            'views': 0,
+            'createdAt': now_utc.isoformat(),
+            'groundbreaking': False,
+            'status': 'draft',
+        }
+
+        doc_ref = db.collection('articles').document(article_id)
+        doc_ref.set(doc_data)
+        doc_ref.collection('content').document('main').set({'body': []})
+
+        return {'success': True, 'article_id': article_id}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to create article draft: {str(e)}',
+        }
+
+
+def update_article_content(article_id: str, content: List[Dict]):
+    """
+    Replaces the content body of an existing article and refreshes its read time.
+    
+    Args:
+        article_id (str): Unique identifier for the article
+        content (List[Dict]): Sections completed so far
+    
+    Returns:
+        dict: Result containing success status or error
+    """
+    try:
+        doc_ref = db.collection('articles').document(article_id)
+        doc_ref.collection('content').document('main').set({'body': content})
+        doc_ref.update({'readTime': calculate_read_time(content)})
+
+        return {'success': True, 'article_id': article_id}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to update article content: {str(e)}',
+        }
+
+
+def publish_article(article_id: str, title: str, subtitle: str, categories: List[str],
+                    content: List[Dict], sources: List[str], groundbreaking: bool = False):
+    """
+    Writes the final fields of a draft article and flips its status to published.
+    
+    Returns:
+        dict: Result containing success status or error
+    """
+    try:
+        for category in categories:
+            if category not in VALID_CATEGORIES:
+                return {
+                    'success': False,
+                    'error': f'Invalid categories. Must be one of: {", ".join(VALID_CATEGORIES)}'
+                }
+
+        doc_ref = db.collection('articles').document(article_id)
+        doc_ref.collection('content').document('main').set({'body': content})
+        doc_ref.set({
+            'title': title,
+            'subtitle': subtitle,
+            'categories': categories,
+            'sources': sources,
+            'readTime': calculate_read_time(content),
+            'groundbreaking': groundbreaking,
+            'status': 'published',
+            # Readers only see published articles, so incremental refreshes by createdAt start from here
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+        }, merge=True)
+
+        increment_newsletter_date()
+
+        return {
+            'success': True,
+            'article_id': article_id,
+            'document_ref': doc_ref
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to publish article: {str(e)}',
+        }
+
+
+def is_published(article_data: Dict[str, Any]) -> bool:
+    """
+    Whether an article document is visible to readers. Streaming drafts that were never
+    finalized stay 'draft', articles written before statuses existed count as published.
+    """
+    return article_data.get('status', 'published') == 'published'
+
+
+def get_recent_articles(date_from: str, created_after: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetches article documents for similarity checks against the archive.
+    
+    Args:
+        date_from (str): Oldest article date to include, in YYYY-MM-DD format
+        created_after (str, optional): Only return articles with a later createdAt timestamp,
+            used to refresh a local copy incrementally
+    
+    Returns:
+        List[Dict]: Article fields (no content body) with their document id under 'id'
+    """
+    articles_ref = db.collection('articles')
+    if created_after:
+        query = articles_ref.where('createdAt', '>', created_after)
+    else:
+        query = articles_ref.where('date', '>=', date_from)
+
+    articles = []
+    for doc in query.stream():
+        article_data = doc.to_dict()
+        if article_data.get('date', '') < date_from or not is_published(article_data):
+            continue
+        article_data['id'] = doc.id
+        articles.append(article_data)
+    return articles
+
+
+def get_newsletter_dates() -> List[Dict[str, Any]]:
+    """
+    Fetches every newsletter_dates document, newest date first.
+    """
+    docs = db.collection('newsletter_dates').order_by('date', direction=firestore.Query.DESCENDING).stream()
+    return [doc.to_dict() for doc in docs]
+
+
+def get_articles_by_date(date: str) -> List[Dict[str, Any]]:
+    """
+    Fetches the article documents (no content body) published on a date, with their id under 'id'.
+    Drafts are left out.
+    """
+    articles = []
+    for doc in db.collection('articles').where('date', '==', date).stream():
+        article_data = doc.to_dict()
+        if not is_published(article_data):
+            continue
+        article_data['id'] = doc.id
+        articles.append(article_data)
+    return articles
+
+
+def get_article_content(article_id: str) -> List[Dict]:
+    """
+    Fetches the content sections of an article, or an empty list if it has none.
+    """
+    content_doc = db.collection('articles').document(article_id).collection('content').document('main').get()
+    if not content_doc.exists:
+        return []
+    return content_doc.to_dict().get('body', [])
+
+
 def calculate_read_time(
     sections: List[Dict],
     words_per_minute: int = 200
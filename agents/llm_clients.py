@@ -0,0 +1,100 @@
+import threading
+from typing import Dict, Tuple, Type
+import httpx
+from pydantic import BaseModel
+from langchain_core.runnables import Runnable
+from langchain_ollama import ChatOllama
+from langchain_openai import ChatOpenAI
+
+# Process-wide registry of LLM clients. Every agent in the process shares one pooled
+# HTTP client per provider and one chat model per (provider, model, temperature), so
+# pipeline runs reuse open keep-alive connections instead of re-handshaking.
+
+PROVIDER_BASE_URLS = {
+    "openrouter": "https://openrouter.ai/api/v1",
+}
+
+_lock = threading.Lock()
+_http_clients: Dict[str, httpx.Client] = {}
+_async_http_clients: Dict[str, httpx.AsyncClient] = {}
+_chat_models: Dict[Tuple, Runnable] = {}
+_structured_models: Dict[Tuple, Runnable] = {}
+
+_POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+# ========================================== HTTP CLIENTS ==========================================
+
+def get_http_client(provider: str = "openrouter") -> httpx.Client:
+    """Shared keep-alive HTTP/2 client for a provider"""
+    with _lock:
+        if provider not in _http_clients:
+            _http_clients[provider] = httpx.Client(http2=True, limits=_POOL_LIMITS, timeout=_TIMEOUT)
+        return _http_clients[provider]
+
+
+def get_async_http_client(provider: str = "openrouter") -> httpx.AsyncClient:
+    """Shared keep-alive HTTP/2 async client for a provider"""
+    with _lock:
+        if provider not in _async_http_clients:
+            _async_http_clients[provider] = httpx.AsyncClient(http2=True, limits=_POOL_LIMITS, timeout=_TIMEOUT)
+        return _async_http_clients[provider]
+
+
+# ========================================== CHAT MODELS ==========================================
+
+def get_chat_model(model: str, api_key: str, temperature: float = 0.3, provider: str = "openrouter") -> ChatOpenAI:
+    """Shared OpenAI-compatible chat model backed by the provider's pooled HTTP client"""
+    key = (provider, model, temperature, api_key)
+    # Create the HTTP clients outside the registry lock, they take it themselves
+    http_client = get_http_client(provider)
+    http_async_client = get_async_http_client(provider)
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                base_url=PROVIDER_BASE_URLS[provider],
+                # Retries and backoff are handled by agents.request_scheduler
+                max_retries=0,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+        return _chat_models[key]
+
+
+def get_structured_model(schema: Type[BaseModel], model: str, api_key: str, temperature: float = 0.3,
+                         provider: str = "openrouter", include_raw: bool = False) -> Runnable:
+    """
+    Structured-output wrapper around the shared chat model. With include_raw the wrapper
+    returns {"raw", "parsed", "parsing_error"} instead of raising on malformed output.
+    """
+    key = (schema, provider, model, temperature, api_key, include_raw)
+    chat_model = get_chat_model(model, api_key, temperature=temperature, provider=provider)
+    with _lock:
+        if key not in _structured_models:
+            _structured_models[key] = chat_model.with_structured_output(schema, include_raw=include_raw)
+        return _structured_models[key]
+
+
+def get_ollama_model(model: str, temperature: float = 0.3) -> ChatOllama:
+    """Shared local Ollama chat model"""
+    key = ("ollama", model, temperature, None)
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOllama(model=model, temperature=temperature)
+        return _chat_models[key]
+
+
+def close_clients():
+    """Close every pooled HTTP client, for use at process shutdown"""
+    with _lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        # Async clients need an event loop to close, they are released with the process
+        _async_http_clients.clear()
+        _chat_models.clear()
+        _structured_models.clear()
@@ -0,0 +1,142 @@
+import hashlib
+import html
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+import requests
+
+# Local retrieval over the RSS entries a topic was built from. Entry bodies (and, optionally,
+# the linked pages, cached on disk) are split into passages and ranked with Okapi BM25, so the
+# research loop can answer most questions from material we already collected and only falls
+# back to web_search for gaps.
+
+DEFAULT_PAGE_CACHE_DIR = os.path.join(os.getenv("NEURAL_NEWS_DATA_DIR", ".data"), "page_cache")
+
+_TAG_RE = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.DOTALL | re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "were", "will", "with",
+}
+
+
+def html_to_text(markup: str) -> str:
+    return re.sub(r"\s+", " ", html.unescape(_TAG_RE.sub(" ", markup or ""))).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# ========================================== PAGE CACHE ==========================================
+
+class PageCache:
+    """Plain-text copies of fetched source pages, keyed by URL hash"""
+
+    def __init__(self, cache_dir: str = DEFAULT_PAGE_CACHE_DIR, timeout: float = 10.0):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".txt")
+
+    def get(self, url: str) -> Optional[str]:
+        path = self._path(url)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        try:
+            response = requests.get(url, timeout=self.timeout, headers={"User-Agent": "NeuralNews/1.0"})
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"    ⚠️ Could not fetch source page {url}: {e}")
+            return None
+        text = html_to_text(response.text)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return text
+
+
+# ========================================== BM25 INDEX ==========================================
+
+class LocalRetriever:
+    """BM25 over passages of the RSS entries (and optionally their pages) behind a topic"""
+
+    def __init__(self, entries: List[Dict], page_cache: Optional[PageCache] = None, min_entry_words: int = 80,
+                 passage_words: int = 120, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.passages: List[Dict] = []
+        self.passage_entries: List[int] = []
+
+        for entry_index, entry in enumerate(entries):
+            text = html_to_text(entry.get("summary", ""))
+            # Feed bodies that are just a teaser are backed by the linked page when a cache is given
+            if page_cache and entry.get("link") and len(text.split()) < min_entry_words:
+                text = page_cache.get(entry["link"]) or text
+            words = text.split()
+            for start in range(0, max(len(words), 1), passage_words):
+                passage = " ".join(words[start:start + passage_words])
+                if passage:
+                    self.passages.append({
+                        "title": entry.get("title", ""),
+                        "url": entry.get("link", ""),
+                        "source": entry.get("source", ""),
+                        "published_date": entry.get("published_date", ""),
+                        "content": passage,
+                    })
+                    self.passage_entries.append(entry_index)
+
+        self.passage_terms = [Counter(tokenize(f"{p['title']} {p['content']}")) for p in self.passages]
+        self.lengths = [sum(terms.values()) for terms in self.passage_terms]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        document_frequency = Counter(term for terms in self.passage_terms for term in terms)
+        n = len(self.passages)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def _scores(self, query: str) -> List:
+        query_terms = set(tokenize(query))
+        scored = []
+        for index, terms in enumerate(self.passage_terms):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1))
+            for term in query_terms:
+                frequency = terms.get(term)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            if score > 0:
+                scored.append((score, index))
+        return sorted(scored, reverse=True)
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
+        """Top-k passages with their BM25 score, in the same shape as web_search results"""
+        return [{**self.passages[index], "score": round(score, 3)} for score, index in self._scores(query)[:k]]
+
+    def top_entries(self, query: str, k: int = 5) -> List[int]:
+        """Indices of the k entries with the best matching passage"""
+        ranked = []
+        for _, index in self._scores(query):
+            if self.passage_entries[index] not in ranked:
+                ranked.append(self.passage_entries[index])
+            if len(ranked) == k:
+                break
+        return ranked
+
+    def search_json(self, query: str, k: int = 5) -> str:
+        results = self.search(query, k)
+        if not results:
+            return "No matching source articles. Use web_search for this query."
+        return json.dumps(results, indent=2)
+
+
+def rank_entries(entries: List[Dict], query: str, k: int = 5) -> List[Dict]:
+    """The k entries most relevant to a query, used when topics come back without source references"""
+    retriever = LocalRetriever(entries)
+    return [entries[index] for index in retriever.top_entries(query, k)]
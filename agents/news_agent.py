@@ -1,16 +1,23 @@
 from langgraph.graph import StateGraph, END
 from typing import Dict, List, Optional, TypedDict
 from langgraph.prebuilt import ToolNode
-from langchain_ollama import ChatOllama
 from langchain_core.messages import BaseMessage
-from langchain_openai import ChatOpenAI
-import feedparser
 from datetime import datetime, timedelta, timezone
-import json, os, time
+import json, os, re, time, uuid
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import List, Literal, Union
 from agents.article_agent import ArticleAgent
-from agents.firestore_utils import create_article, create_newsletter_date
+from agents.llm_clients import get_structured_model
+from agents.request_scheduler import get_scheduler
+from agents.structured_repair import repair_structured_output
+from agents.feed_parser import fetch_feed_articles
+from agents.local_retrieval import rank_entries
+from agents.feed_schedule import PollingPlanner
+from agents.topic_dedup import TopicDeduplicator
+from agents.work_queue import open_queue
+from agents.static_export import StaticExporter
+from agents.outbox import ArticleOutbox, OutboxFlusher, topic_article_id
+from agents.firestore_utils import create_newsletter_date
 from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
@@ -34,6 +41,10 @@ class Topic(BaseModel):
     categories: List[Literal["Technology", "Business", "Science", "Entertainment", "Politics"]] = Field(
         description="List of relevant categories from the allowed set"
     )
+    # Models often echo the "[n]" labels back, the values are parsed in _topic_entries
+    source_ids: List[Union[int, str]] = Field(
+        default=[], description="Numbers of the RSS articles this topic is based on, as plain integers"
+    )
 
 class TopicsResponse(BaseModel):
     """Collection of trending news topics"""
@@ -48,18 +59,43 @@ class NewsGenerationAgent:
     # ========================================== INITIALIZATION ==========================================
 
     # The default model can have problems with structured outputs use another model if deployed
-    def __init__(self, api_key: str, model: str = "qwen/qwen3-235b-a22b:free"):
+    def __init__(self, api_key: str, model: str = "qwen/qwen3-235b-a22b:free", stream_write: bool = False,
+                 fallback_model: Optional[str] = os.getenv("OPENROUTER_FALLBACK_MODEL"),
+                 feed_backend: str = os.getenv("FEED_PARSER", "feedparser"),
+                 adaptive_polling: bool = os.getenv("ADAPTIVE_POLLING") == "1",
+                 dedup_topics: bool = os.getenv("DEDUP_TOPICS", "1") == "1",
+                 queue_url: Optional[str] = os.getenv("TOPIC_QUEUE_URL"), queue_timeout: float = 3600.0,
+                 static_export_dir: Optional[str] = os.getenv("STATIC_EXPORT_DIR")):
         """Updated initialization with ReAct agent setup"""
         
         self.api_key = api_key
+        # "fast" streams feeds with lxml and stops at the per-feed limit, see agents/feed_parser.py
+        self.feed_backend = feed_backend
+        # Only fetch feeds that are due according to their update history, see agents/feed_schedule.py
+        self.polling_planner = PollingPlanner() if adaptive_polling else None
+        # Drops topics already covered in the recent archive, see agents/topic_dedup.py
+        self.deduplicator = TopicDeduplicator() if dedup_topics else None
+        # Hand topics to agents.worker processes instead of generating in-process, see agents/work_queue.py
+        self.topic_queue = open_queue(queue_url) if queue_url else None
+        self.queue_timeout = queue_timeout
+        # Generated articles are written to Firestore through a local durable outbox, see agents/outbox.py
+        self.outbox = ArticleOutbox()
+        self.outbox_flusher = OutboxFlusher(self.outbox)
+        # Re-render the read API to static JSON after each run, see agents/static_export.py
+        self.static_exporter = StaticExporter(static_export_dir) if static_export_dir else None
+        # Persist articles section by section while they are written
+        self.stream_write = stream_write
+
+        # Topic analysis LLM (structured output) from the shared client registry
+        self.llm = get_structured_model(TopicsResponse, model, api_key, temperature=0.3, include_raw=True)
+        self.fallback_llms = [
+            get_structured_model(TopicsResponse, fallback_model, api_key, temperature=0.3, include_raw=True)
+        ] if fallback_model else []
+        self.scheduler = get_scheduler("openrouter")
 
-        # Topic analysis LLM (structured output)
-        self.llm = ChatOpenAI(
-            model=model, 
-            temperature=0.3,
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        ).with_structured_output(TopicsResponse)
+        # Reused across runs instead of rebuilding the agent and its graph every time
+        self.article_agent = ArticleAgent(api_key=api_key, stream_write=stream_write,
+                                          fallback_writing_model=fallback_model)
         
         # Build the graph
         self.graph = self._build_graph()
@@ -71,16 +107,27 @@ class NewsGenerationAgent:
         # Add nodes
         workflow.add_node("data_collection", self.data_collection_node)
         workflow.add_node("prepare_topics", self.prepare_topics_node)
+        workflow.add_node("deduplicate_topics", self.deduplicate_topics_node)
         workflow.add_node("article_generation", self.article_generation_node)
+        workflow.add_node("static_export", self.static_export_node)
 
         
         # Define the workflow edges
         workflow.set_entry_point("data_collection")
         
-        # Conditional edge: if needs more data, go back to data collection
-        workflow.add_edge("data_collection", "prepare_topics")
-        workflow.add_edge("prepare_topics", "article_generation")
-        workflow.add_edge("article_generation", END)
+        # Conditional edge: end the run when nothing new was collected
+        workflow.add_conditional_edges(
+            "data_collection",
+            self._has_new_entries,
+            {
+                "continue": "prepare_topics",
+                "end": END
+            }
+        )
+        workflow.add_edge("prepare_topics", "deduplicate_topics")
+        workflow.add_edge("deduplicate_topics", "article_generation")
+        workflow.add_edge("article_generation", "static_export")
+        workflow.add_edge("static_export", END)
                 
         return workflow.compile()
     
@@ -98,7 +145,8 @@ class NewsGenerationAgent:
         collected_data = {
             "rss_feeds": [],
             "collection_timestamp": datetime.now().isoformat(),
-            "total_sources": 0
+            "total_sources": 0,
+            "new_entries": 0
         }
         
         # Load news sources from JSON file
@@ -111,56 +159,39 @@ class NewsGenerationAgent:
             return state
         
         print(f"    📡 Collecting from RSS feeds...")
+
+        if self.polling_planner:
+            due_sources = self.polling_planner.due_sources(news_sources)
+            print(f"        🗓️ {len(due_sources)} of {len(news_sources)} sources due for polling")
+            news_sources = due_sources
         
         # Collect from RSS feeds
         for source_name, source_info in news_sources.items():
+            started = time.monotonic()
             try:
                 print(f"        📰 Fetching RSS from {source_name}...")
                 
-                # Parse RSS feed
-                feed = feedparser.parse(source_info["rss"])
-                
-                # Process recent entries (last 48 hours)
+                # Process recent entries (last 48 hours), limit to 20 most recent
                 cutoff_time = datetime.now() - timedelta(hours=48)
-                
-                for entry in feed.entries[:20]:  # Limit to 20 most recent
-                    try:
-                        # Parse publication date
-                        pub_date = None
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_date = datetime(*entry.published_parsed[:6])
-                        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            pub_date = datetime(*entry.updated_parsed[:6])
-                        
-                        # Skip if too old
-                        if pub_date and pub_date < cutoff_time:
-                            continue
-                        
-                        # Extract content
-                        summary = getattr(entry, 'summary', '')
-                        if hasattr(entry, 'content') and entry.content:
-                            summary = entry.content[0].value if entry.content else summary
-                        
-                        article_data = {
-                            "title": entry.title,
-                            "link": entry.link,
-                            "summary": summary,
-                            "source": source_name,
-                            "category": source_info["category"],
-                            "published_date": pub_date.isoformat() if pub_date else datetime.now().isoformat(),
-                            "tags": getattr(entry, 'tags', []),
-                            "word_count": len(summary.split()) if summary else 0
-                        }
-                        
-                        collected_data["rss_feeds"].append(article_data)
-                        
-                    except Exception as e:
-                        print(f"    ⚠️ Error processing entry from {source_name}: {e}")
-                        continue
-                        
+                articles = fetch_feed_articles(source_name, source_info, cutoff_time, limit=20, backend=self.feed_backend)
+                collected_data["rss_feeds"].extend(articles)
+
+                if self.polling_planner:
+                    new_count = self.polling_planner.record_success(
+                        source_name, articles, time.monotonic() - started, source_info)
+                    print(f"        🆕 {new_count} new entries from {source_name}")
+                else:
+                    new_count = len(articles)
+                collected_data["new_entries"] += new_count
+
             except Exception as e:
                 print(f"  ❌ Error fetching RSS from {source_name}: {e}")
+                if self.polling_planner:
+                    self.polling_planner.record_failure(source_name, e, time.monotonic() - started, source_info)
                 continue
+
+        if self.polling_planner:
+            self.polling_planner.save()
         
         # Calculate totals
         collected_data["total_sources"] = len(collected_data["rss_feeds"])
@@ -186,18 +217,16 @@ class NewsGenerationAgent:
         articles = rss_data.get("rss_feeds", [])
         
         if not articles:
-            print("    ⚠️ No RSS data available, using default topics")
-            topics = [{
-                "summary": "No RSS data available for analysis",
-                "categories": ["Technology"]
-            }]
-            state["topics"] = topics
+            # Never research a placeholder topic, the graph normally ends before this node
+            print("    ⚠️ No RSS data available, no topics to prepare")
+            state["topics"] = []
             return state
         
         # Prepare article summaries for LLM analysis
         article_summaries = []
-        for article in articles[:30]:  # Limit to 30 articles to avoid token limits
-            summary_text = f"Title: {article.get('title', '')}\n"
+        candidates = articles[:30]  # Limit to 30 articles to avoid token limits
+        for i, article in enumerate(candidates):
+            summary_text = f"[{i}] Title: {article.get('title', '')}\n"
             summary_text += f"Summary: {article.get('summary', '')[:200]}...\n"
             summary_text += f"Category: {article.get('category', '')}\n"
             summary_text += f"Source: {article.get('source', '')}\n"
@@ -221,6 +250,7 @@ class NewsGenerationAgent:
         For each topic, provide:
         - A lengthy and concise summary (5-7 sentences) of what the topic covers. Give context of the date and location of topics if possible.
         - Relevant categories from this list ONLY: ["Technology", "Business", "Science", "Entertainment", "Politics"]
+        - The numbers of the RSS articles the topic is based on (source_ids), as plain integers like [0, 4, 7]
         
         Respond ONLY in JSON format like this. No extra explanations or comments:
         {TopicsResponse.model_json_schema()}
@@ -230,21 +260,32 @@ class NewsGenerationAgent:
         
         try:
             print("    🤖 Analyzing RSS data with LLM...")
-            response = self.llm.invoke(prompt)
-            
-            # The response is already a TopicsResponse object, no need to parse JSON
+            output = self.scheduler.run(
+                lambda: self.llm.invoke(prompt),
+                fallbacks=[lambda llm=llm: llm.invoke(prompt) for llm in self.fallback_llms],
+            )
+
+            # Malformed JSON and near-miss categories are repaired locally instead of re-asking the model
+            response = repair_structured_output(TopicsResponse, output)
+            if response is None:
+                raise ValueError(f"Unusable topics output: {output.get('parsing_error')}")
+
             topics = []
             for topic in response.topics:
+                if not topic.title:
+                    continue
                 topics.append({
                     "title": topic.title,
                     "summary": topic.summary,
-                    "categories": topic.categories
+                    "categories": topic.categories or ["Technology"],
+                    "rss_entries": self._topic_entries(topic, candidates, articles)
                 })
             
             if topics:
                 print(f"    ✅ Generated {len(topics)} topics from RSS analysis")
                 for i, topic in enumerate(topics, 1):
-                    print(f"        {i}. {topic['categories']}: {topic['title']} - {topic['summary'][:80]}...")
+                    print(f"        {i}. {topic['categories']}: {topic['title']} - {topic['summary'][:80]}... "
+                          f"({len(topic['rss_entries'])} source articles)")
             else:
                 raise ValueError("No topics generated from structured output")
                 
@@ -256,36 +297,73 @@ class NewsGenerationAgent:
         state["topics"] = topics
         return state
     
+    def _topic_entries(self, topic: Topic, candidates: List[Dict], articles: List[Dict],
+                       max_entries: int = 8) -> List[Dict]:
+        """The collected RSS entries behind a topic, carried with it so research can start from them"""
+        indices = [int(number) for value in topic.source_ids for number in re.findall(r"\d+", str(value))]
+        entries = [candidates[i] for i in dict.fromkeys(indices) if i < len(candidates)]
+        if not entries:
+            # The model did not reference its sources, pick the best matching entries instead
+            entries = rank_entries(articles, f"{topic.title} {topic.summary}", k=5)
+        return [
+            {key: entry.get(key, "") for key in ("title", "link", "summary", "source", "published_date")}
+            for entry in entries[:max_entries]
+        ]
+
+    def deduplicate_topics_node(self, state: NewsAgentState) -> NewsAgentState:
+        """
+        Node 3: Deduplicate Topics
+        Drops topics that repeat recently published articles and marks near matches as follow-ups
+        """
+        print("🧹 Executing Deduplicate Topics Node")
+
+        if not self.deduplicator:
+            return state
+
+        try:
+            topics = self.deduplicator.filter(state["topics"])
+            print(f"    ✅ Kept {len(topics)} of {len(state['topics'])} topics")
+            state["topics"] = topics
+        except Exception as e:
+            # Without the archive every topic goes through, as before
+            print(f"    ⚠️ Error deduplicating topics, keeping all: {e}")
+
+        return state
+
     def article_generation_node(self, state: NewsAgentState) -> NewsAgentState:
         """
-        Node 3: Article Generation with ReAct Web Search
+        Node 4: Article Generation with ReAct Web Search
         Generates articles for selected categories
         """
         print("✍️ Executing Article Generation Node")
         
         try:
-            # Comment out create_newsletter_date() and create_article() if just testing without firebase set up
-            article_agent = ArticleAgent(api_key=self.api_key)
-
+            # Comment out create_newsletter_date() if just testing without firebase set up
             create_newsletter_date()
 
-            for topic in state["topics"]:
-                article = article_agent.invoke(topic)
+            # Drains finished articles (and any left over from earlier runs) while generation continues
+            self.outbox_flusher.start()
+            date = str(datetime.now(timezone.utc).date().isoformat())
+
+            generated = self._generate_queued(state["topics"]) if self.topic_queue else self._generate_local(state["topics"])
+            for article_id, article in generated:
                 final_article = article["final_article"]
                 print("Article: ", final_article)
 
-                article_result = create_article(
-                    article_id=str(int(time.time())),
-                    title=final_article.get("title"),
-                    subtitle=final_article.get("subtitle"),
-                    categories=final_article.get("categories"),
-                    content=final_article.get("sections"),
-                    sources=final_article.get("sources"),
-                    date=str(datetime.now(timezone.utc).date().isoformat()),
-                    groundbreaking=final_article.get("groundbreaking", False),
-                )
-
-                print("Article Creation: ", article_result)
+                if article["persisted"] and article["published"]:
+                    # Streaming mode persists and publishes inside the agent
+                    print("Article Published: ", article_id)
+                    continue
+
+                # A streamed article that failed to publish is finished in place of its draft
+                outbox_id = self.outbox.add(final_article, date=date,
+                                            article_id=article_id if article["persisted"] else None)
+                self.outbox_flusher.notify()
+                print("Article Queued: ", outbox_id)
+
+            remaining = self.outbox_flusher.drain()
+            if remaining:
+                print(f"    ⚠️ {remaining} article(s) still in the outbox, they will be flushed on the next run")
         except Exception as e:
             print(f"    ⚠️ Error generating articles with ArticleAgent: {e}")
             raise Exception("Error generating articles with ArticleAgent")
@@ -294,8 +372,68 @@ class NewsGenerationAgent:
 
 
 
+    def static_export_node(self, state: NewsAgentState) -> NewsAgentState:
+        """
+        Node 5: Static Export
+        Writes changed dates and new articles to the static JSON snapshot
+        """
+        print("📦 Executing Static Export Node")
+
+        if not self.static_exporter:
+            return state
+
+        try:
+            self.static_exporter.run()
+        except Exception as e:
+            # The snapshot catches up on the next run
+            print(f"    ⚠️ Error exporting static snapshot: {e}")
+
+        return state
+
     # ========================================== HELPER METHODS ==========================================
 
+    def _has_new_entries(self, state: NewsAgentState) -> str:
+        """End the run when no sources were due or none of them had new entries"""
+        if not state["rss_data"].get("new_entries"):
+            print("    💤 No new RSS entries, nothing to generate this run")
+            return "end"
+        return "continue"
+
+    def _generate_local(self, topics: List[Dict]):
+        """Generate articles one by one in this process"""
+        date = str(datetime.now(timezone.utc).date().isoformat())
+        for topic in topics:
+            article_id = topic_article_id(topic, date)
+            article = self.article_agent.invoke(topic, article_id=article_id)
+            if not article or not article.get("final_article"):
+                print(f"    ⚠️ Topic '{topic.get('title', '')}' not generated")
+                continue
+            yield article_id, {
+                "final_article": article["final_article"],
+                "published": article["published"],
+                "persisted": article["draft"] is not None,
+            }
+
+    def _generate_queued(self, topics: List[Dict]):
+        """Enqueue the topics for agents.worker processes and collect their results"""
+        run_id = uuid.uuid4().hex
+        for topic in topics:
+            self.topic_queue.enqueue(run_id, topic)
+        print(f"    📬 Enqueued {len(topics)} topics as run {run_id}, waiting for workers")
+
+        jobs = self.topic_queue.wait_for_run(run_id, timeout=self.queue_timeout)
+        for job in jobs:
+            if job["status"] != "done":
+                print(f"    ⚠️ Topic '{job['topic'].get('title', '')}' not generated: {job['status']} {job['error'] or ''}")
+
+        # Results of this run, plus articles of earlier runs that finished after they stopped waiting
+        for job in self.topic_queue.uncollected():
+            if job["run_id"] != run_id:
+                print(f"    📥 Collecting late article from run {job['run_id']}: {job['topic'].get('title', '')}")
+            yield job["result"]["article_id"], job["result"]
+            # Only marked once the article has been handed to the outbox
+            self.topic_queue.mark_collected([job["id"]])
+
     
     def run(self, initial_state: Optional[NewsAgentState] = None) -> NewsAgentState:
         """Execute the complete news generation workflow"""
@@ -325,7 +463,7 @@ class NewsGenerationAgent:
             print(f"Install graphviz: pip install graphviz")
 
 # Usage example
-# Comment out create_newsletter_date() and create_article() if just testing without firebase set up
+# Comment out create_newsletter_date() if just testing without firebase set up
 if __name__ == "__main__":
     openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
     if not openrouter_api_key:
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Local durable outbox between article generation and Firestore. Generated articles are
+# committed to SQLite (WAL) under a content-derived id and a background flusher drains them
+# to the store in batches, retrying with backoff. Articles that keep failing are kept as
+# 'dead' rows rather than dropped, and anything left pending is flushed on the next start.
+
+DEFAULT_OUTBOX_PATH = os.path.join(os.getenv("NEURAL_NEWS_DATA_DIR", ".data"), "article_outbox.db")
+
+
+def _short_hash(payload: Dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def article_id_for(article: Dict, date: str) -> str:
+    """Idempotent id of a generated article: the same article on the same date always maps to the same id"""
+    return _short_hash({"date": date, "title": article.get("title"), "sections": article.get("sections")})
+
+
+def topic_article_id(topic: Dict, date: str) -> str:
+    """Id for an article persisted before its content exists (streaming drafts), derived from its topic"""
+    return _short_hash({"date": date, "title": topic.get("title"), "summary": topic.get("summary")})
+
+
+class ArticleOutbox:
+    """SQLite-backed queue of articles waiting to be written to Firestore"""
+
+    def __init__(self, path: str = DEFAULT_OUTBOX_PATH, max_attempts: int = 8):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    article_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_attempt_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, article: Dict, date: str, article_id: Optional[str] = None) -> str:
+        """
+        Durably record a generated article. Adding the same article twice is a no-op.
+        `article_id` overrides the content-derived id, e.g. to finish a streamed draft in place.
+        """
+        article_id = article_id or article_id_for(article, date)
+        payload = {
+            "article_id": article_id,
+            "title": article.get("title"),
+            "subtitle": article.get("subtitle"),
+            "categories": article.get("categories") or [],
+            "content": article.get("sections") or [],
+            "sources": article.get("sources") or [],
+            "date": date,
+            "groundbreaking": article.get("groundbreaking", False),
+        }
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox (article_id, payload, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, 'pending', ?, ?)",
+                (article_id, json.dumps(payload), now, now),
+            )
+        return article_id
+
+    def due(self, limit: int) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY created_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [json.loads(row["payload"]) for row in rows]
+
+    def pending_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def mark_sent(self, article_ids: List[str]):
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'sent', last_error = NULL WHERE article_id = ?",
+                [(article_id,) for article_id in article_ids],
+            )
+
+    def mark_failed(self, article_ids: List[str], error: str, retryable: bool = True):
+        """Schedule a retry with exponential backoff, or park the article as dead"""
+        now = time.time()
+        with self._connect() as conn:
+            for article_id in article_ids:
+                conn.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, last_error = ?, "
+                    "status = CASE WHEN ? OR attempts + 1 >= ? THEN 'dead' ELSE 'pending' END, "
+                    "next_attempt_at = ? + MIN(600, 5 * (1 << attempts)) "
+                    "WHERE article_id = ?",
+                    (error, not retryable, self.max_attempts, now, article_id),
+                )
+
+
+class OutboxFlusher:
+    """Background thread that drains the outbox to Firestore in batches"""
+
+    def __init__(self, outbox: ArticleOutbox, batch_size: int = 20, interval: float = 2.0):
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="outbox-flusher", daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Flush soon instead of waiting for the next interval"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                while self.flush_once():
+                    pass
+            except Exception as e:
+                print(f"    ⚠️ Outbox flush error: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def flush_once(self) -> int:
+        """Send one batch. Returns the number of articles handled."""
+        from agents.firestore_utils import create_articles_batch, get_published_article_ids
+
+        batch = self.outbox.due(self.batch_size)
+        if not batch:
+            return 0
+
+        # A previous flush may have committed without recording it, never write those twice
+        already_published = set(get_published_article_ids([article["article_id"] for article in batch]))
+        if already_published:
+            self.outbox.mark_sent(list(already_published))
+        batch = [article for article in batch if article["article_id"] not in already_published]
+        if not batch:
+            return len(already_published)
+
+        result = create_articles_batch(batch)
+        if result["success"]:
+            self._record(result)
+            return len(batch) + len(already_published)
+
+        if len(batch) == 1:
+            self.outbox.mark_failed([batch[0]["article_id"]], result["error"])
+            print(f"    ⚠️ Outbox write of {batch[0]['article_id']} failed, will retry: {result['error']}")
+            return len(already_published)
+
+        # The batch commits all or nothing, retry one by one so only a bad article is parked
+        print(f"    ⚠️ Outbox batch of {len(batch)} failed ({result['error']}), retrying articles one at a time")
+        handled = len(already_published)
+        for article in batch:
+            result = create_articles_batch([article])
+            if not result["success"]:
+                self.outbox.mark_failed([article["article_id"]], result["error"])
+                print(f"    ⚠️ Article {article['article_id']} failed, will retry: {result['error']}")
+                continue
+            self._record(result)
+            handled += 1
+        return handled
+
+    def _record(self, result: Dict):
+        """Mark the written articles sent and park the ones the store rejected"""
+        self.outbox.mark_sent(result["article_ids"])
+        for article_id, error in result["rejected"].items():
+            self.outbox.mark_failed([article_id], error, retryable=False)
+            print(f"    ⚠️ Article {article_id} rejected: {error}")
+        if result["article_ids"]:
+            print(f"    📤 Flushed {len(result['article_ids'])} article(s) to Firestore")
+
+    def drain(self, timeout: float = 60.0) -> int:
+        """Wait up to `timeout` for pending articles to be flushed. Returns how many remain."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            remaining = self.outbox.pending_count()
+            if remaining == 0:
+                return 0
+            self.notify()
+            time.sleep(0.5)
+        return self.outbox.pending_count()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,221 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Per-provider defaults, overridable with <PROVIDER>_REQUESTS_PER_MINUTE and <PROVIDER>_MAX_CONCURRENCY.
+# <PROVIDER>_MAX_RETRY_AFTER caps the Retry-After wait honored before failing over (default 300s).
+# OpenRouter's free tier allows roughly 20 requests per minute per model.
+PROVIDER_LIMITS = {
+    "openrouter": {"requests_per_minute": 20, "max_concurrency": 4},
+    "tavily": {"requests_per_minute": 100, "max_concurrency": 4},
+}
+
+_RATE_LIMITED = "rate_limited"
+_TRANSIENT = "transient"
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                     "ReadTimeout", "RemoteProtocolError", "TimeoutError"}
+
+
+# ========================================== RATE LIMITING ==========================================
+
+class TokenBucket:
+    """Blocking token bucket. Refills continuously at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller back, used when the provider tells us when to come back"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: grows by one slot per window of successful calls and
+    halves whenever the provider throttles us.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.minimum), self.limit / 2)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+# ========================================== ERROR CLASSIFICATION ==========================================
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """Return "rate_limited", "transient" or None for errors that should not be retried"""
+    status = _status_code(error)
+    if status == 429:
+        return _RATE_LIMITED
+    if status in (408, 500, 502, 503, 504):
+        return _TRANSIENT
+    if type(error).__name__ in _TRANSIENT_ERRORS:
+        return _TRANSIENT
+    return None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait according to the provider's Retry-After or rate limit reset headers"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    # OpenRouter reports the window reset as epoch milliseconds
+    reset = headers.get("x-ratelimit-reset")
+    if reset:
+        try:
+            return max(float(reset) / 1000 - time.time(), 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+# ========================================== SCHEDULER ==========================================
+
+class RequestScheduler:
+    """
+    Runs provider calls under a token bucket and an adaptive concurrency limit.
+    Rate-limited and transient failures are retried with backoff (honoring Retry-After up to
+    max_wait), and when the primary call keeps failing the fallbacks are tried in order.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: float, max_concurrency: int,
+                 max_retries: int = 4, base_delay: float = 2.0, max_delay: float = 60.0,
+                 max_wait: float = 300.0):
+        self.provider = provider
+        self.bucket = TokenBucket(rate=requests_per_minute / 60, capacity=max(1.0, requests_per_minute / 6))
+        self.concurrency = AdaptiveConcurrency(maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+
+    def run(self, call: Callable[[], T], fallbacks: Sequence[Callable[[], T]] = (),
+            deadline: Optional[float] = None) -> T:
+        """
+        Run the call, retrying and failing over as needed. With a `deadline` (time.monotonic())
+        no retry is started that could not finish before it, the caller has given up by then.
+        """
+        candidates = [call, *fallbacks]
+        last_error: Optional[Exception] = None
+
+        for index, candidate in enumerate(candidates):
+            if index > 0 and deadline is not None and time.monotonic() >= deadline:
+                break
+            if index > 0:
+                print(f"    🔁 {self.provider}: failing over to fallback {index}/{len(fallbacks)}")
+
+            for attempt in range(self.max_retries + 1):
+                self.bucket.acquire()
+                self.concurrency.acquire()
+                try:
+                    result = candidate()
+                except Exception as e:
+                    kind = classify_error(e)
+                    self.concurrency.release(throttled=kind == _RATE_LIMITED)
+                    if kind is None:
+                        raise
+                    last_error = e
+
+                    delay = retry_after(e)
+                    if delay is not None and delay > self.max_wait:
+                        # e.g. a free-tier daily reset hours away, fail over or give up rather than stall
+                        # the run (and, through the bucket, every other caller of this provider)
+                        print(f"    ⛔ {self.provider} asks to wait {delay:.0f}s, more than the {self.max_wait:.0f}s honored")
+                        break
+                    if delay is None:
+                        delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                    # A long provider-imposed wait is better spent on the fallback, when there is one
+                    has_fallback = index < len(candidates) - 1
+                    if attempt == self.max_retries or (delay > self.max_delay and has_fallback):
+                        break
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        raise
+                    if kind == _RATE_LIMITED:
+                        self.bucket.pause(delay)
+                    print(f"    ⏳ {self.provider} {kind} ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+
+                self.concurrency.release()
+                return result
+
+        raise last_error
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider: str) -> RequestScheduler:
+    """Process-wide scheduler for a provider"""
+    with _schedulers_lock:
+        if provider not in _schedulers:
+            limits = PROVIDER_LIMITS.get(provider, {"requests_per_minute": 60, "max_concurrency": 4})
+            prefix = provider.upper()
+            _schedulers[provider] = RequestScheduler(
+                provider,
+                requests_per_minute=float(os.getenv(f"{prefix}_REQUESTS_PER_MINUTE", limits["requests_per_minute"])),
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", limits["max_concurrency"])),
+                max_wait=float(os.getenv(f"{prefix}_MAX_RETRY_AFTER", 300)),
+            )
+        return _schedulers[provider]
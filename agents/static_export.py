@@ -0,0 +1,124 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict
+from agents.firestore_utils import get_newsletter_dates, get_articles_by_date, get_article_content
+
+# Renders the read API to static, pre-compressed JSON files so a plain web server or CDN
+# can serve the archive without Flask or Firestore:
+#
+#   <out>/api/news/index.json           GET /api/news
+#   <out>/api/news/<date>.json          GET /api/news/<date>
+#   <out>/api/articles/<id>.json        GET /api/articles/<id>
+#
+# Every file is written next to a .gz (and .br when brotli is installed) copy. A manifest
+# of payload hashes makes runs incremental: only dates whose newsletter_dates entry changed
+# (and today) are re-queried, and only new or changed payloads are rewritten.
+#
+# Example nginx mapping:
+#   location /api/ { gzip_static on; default_type application/json;
+#                    try_files $uri.json $uri/index.json =404; }
+
+MANIFEST_NAME = "_manifest.json"
+
+
+def _render(payload: Any) -> bytes:
+    """Serialize exactly like Flask's jsonify in production (sorted keys, compact, trailing newline)"""
+    return (json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=True) + "\n").encode()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_payload(path: str, data: bytes):
+    """Write the JSON file and its pre-compressed variants"""
+    _write_atomic(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+        _write_atomic(path + ".br", brotli.compress(data))
+    except ImportError:
+        pass
+    # Plain file last, so a reader never finds it without its compressed copies
+    _write_atomic(path, data)
+
+
+class StaticExporter:
+    """Incrementally exports the published archive to a static directory tree"""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"dates": {}, "articles": {}, "files": {}}
+
+    def _export(self, relative_path: str, payload: Any) -> bool:
+        """Write a payload if it differs from the last export. Returns True when written."""
+        data = _render(payload)
+        digest = _digest(data)
+        if self.manifest["files"].get(relative_path) == digest:
+            return False
+        _write_payload(os.path.join(self.out_dir, relative_path), data)
+        self.manifest["files"][relative_path] = digest
+        return True
+
+    def run(self) -> Dict[str, int]:
+        print("📦 Exporting static snapshot")
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        written = {"dates": 0, "articles": 0}
+
+        newsletter_dates = get_newsletter_dates()
+        self._export(os.path.join("api", "news", "index.json"), newsletter_dates)
+
+        for newsletter_date in newsletter_dates:
+            date = newsletter_date.get("date")
+            if not date:
+                continue
+            date_digest = _digest(_render(newsletter_date))
+            if self.manifest["dates"].get(date) == date_digest and date != today:
+                continue
+
+            articles = get_articles_by_date(date)
+            if self._export(os.path.join("api", "news", f"{date}.json"), articles):
+                written["dates"] += 1
+
+            for article in articles:
+                article_path = os.path.join("api", "articles", f"{article['id']}.json")
+                # The listing document changes whenever the article does (status, readTime)
+                article_digest = _digest(_render(article))
+                if self.manifest["articles"].get(article["id"]) == article_digest:
+                    continue
+                payload = {"success": True, "article": {**article, "content": get_article_content(article["id"])}}
+                if self._export(article_path, payload):
+                    written["articles"] += 1
+                self.manifest["articles"][article["id"]] = article_digest
+
+            self.manifest["dates"][date] = date_digest
+
+        _write_atomic(self.manifest_path, json.dumps(self.manifest).encode())
+        print(f"    ✅ Snapshot updated: {written['dates']} date(s), {written['articles']} article(s) rewritten")
+        return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the archive as static JSON")
+    parser.add_argument("--out", default=os.getenv("STATIC_EXPORT_DIR", "static_export"))
+    args = parser.parse_args()
+    StaticExporter(args.out).run()
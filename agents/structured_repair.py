@@ -0,0 +1,240 @@
+import difflib
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Sequence, Type, TypeVar, Union, get_args, get_origin
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from langchain_core.messages import BaseMessage
+from langchain_core.utils.json import parse_partial_json
+
+# Local repair of structured LLM outputs. Instead of re-running a whole generation when the
+# model returns slightly broken output, the raw response is salvaged here:
+#   1. extract the JSON (tool call args, fenced blocks, <think> preambles) and fix truncated
+#      or unescaped JSON,
+#   2. coerce it onto the pydantic schema: near-miss Literal values are mapped onto the
+#      allowed set and missing fields are filled from defaults,
+#   3. validate. Callers regenerate only the parts that are still unusable.
+
+M = TypeVar("M", bound=BaseModel)
+
+# Common near-misses for the article categories that string similarity would not catch
+CATEGORY_SYNONYMS = {
+    "tech": "Technology", "ai": "Technology", "artificial intelligence": "Technology", "cybersecurity": "Technology",
+    "health": "Science", "medicine": "Science", "environment": "Science", "climate": "Science", "space": "Science",
+    "economy": "Business", "economics": "Business", "finance": "Business", "markets": "Business",
+    "government": "Politics", "policy": "Politics", "world": "Politics", "elections": "Politics",
+    "culture": "Entertainment", "sports": "Entertainment", "media": "Entertainment", "arts": "Entertainment",
+}
+
+_EMPTY_VALUES = {str: "", bool: False}
+
+_THINK_RE = re.compile(r"<think>.*?(</think>|$)", re.DOTALL)
+
+
+# ========================================== JSON REPAIR ==========================================
+
+def _repair_json_text(text: str) -> str:
+    """Escape raw newlines and tabs inside JSON strings and drop trailing commas outside them"""
+    out = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            elif char == "\r":
+                char = "\\r"
+            elif char == "\t":
+                char = "\\t"
+        elif char == '"':
+            in_string = True
+        elif char in "}]":
+            # Remove a comma (and the whitespace after it) directly before a closing bracket
+            end = len(out)
+            while end and out[end - 1].isspace():
+                end -= 1
+            if end and out[end - 1] == ",":
+                del out[end - 1:]
+        out.append(char)
+    return "".join(out)
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Best-effort parse of malformed or truncated JSON embedded in model output"""
+    if not text:
+        return None
+    # Valid JSON is returned untouched, repairs only apply once it fails to parse
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    text = _THINK_RE.sub("", text)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+    text = text[start:]
+
+    # Complete JSON followed by junk (e.g. a closing code fence) parses once trimmed
+    end = max(text.rfind("}"), text.rfind("]"))
+    for candidate in (text[:end + 1], _repair_json_text(text[:end + 1])):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            pass
+    trimmed = _repair_json_text(text[:end + 1])
+    full = _repair_json_text(text)
+
+    # Truncated output: close unterminated strings, arrays and objects, keeping as much as possible
+    for candidate in (full, trimmed):
+        try:
+            parsed = parse_partial_json(candidate)
+        except json.JSONDecodeError:
+            continue
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def raw_payload(raw: Optional[BaseMessage]) -> Optional[Any]:
+    """The JSON the model produced, from its tool call arguments or its text content"""
+    if raw is None:
+        return None
+    for call in getattr(raw, "tool_calls", None) or []:
+        if isinstance(call.get("args"), dict) and call["args"]:
+            return call["args"]
+    for call in getattr(raw, "invalid_tool_calls", None) or []:
+        parsed = repair_json(call.get("args") or "")
+        if parsed is not None:
+            return parsed
+    content = raw.content if isinstance(raw.content, str) else "".join(
+        part.get("text", "") for part in raw.content if isinstance(part, dict)
+    )
+    return repair_json(content)
+
+
+# ========================================== SCHEMA COERCION ==========================================
+
+def coerce_literal(value: Any, allowed: List[str]) -> Optional[str]:
+    """Map a near-miss value onto one of the allowed Literal values"""
+    if not isinstance(value, str):
+        return None
+    cleaned = value.strip()
+    lowered = {option.lower(): option for option in allowed}
+    if cleaned.lower() in lowered:
+        return lowered[cleaned.lower()]
+    synonym = CATEGORY_SYNONYMS.get(cleaned.lower())
+    if synonym in allowed:
+        return synonym
+    match = difflib.get_close_matches(cleaned.lower(), list(lowered), n=1, cutoff=0.6)
+    return lowered[match[0]] if match else None
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _coerce(annotation: Any, value: Any) -> Any:
+    origin = get_origin(annotation)
+
+    if origin is Union:
+        options = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _coerce(options[0], value) if value is not None and len(options) == 1 else value
+
+    if origin is Literal:
+        return coerce_literal(value, list(get_args(annotation)))
+
+    if origin in (list, List):
+        (item_type,) = get_args(annotation) or (Any,)
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        # Items that cannot be mapped or still fail validation (e.g. unknown categories,
+        # a nested topic missing its title) are dropped instead of failing the whole list
+        items = []
+        for item in value:
+            item = _coerce(item_type, item)
+            if item is None:
+                continue
+            try:
+                items.append(_adapter(item_type).validate_python(item))
+            except ValidationError:
+                continue
+        return items
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return coerce_to_schema(annotation, value) if isinstance(value, dict) else None
+
+    if annotation is bool and isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "1")
+
+    if annotation is str and value is not None and not isinstance(value, str):
+        return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+    return value
+
+
+def coerce_to_schema(schema: Type[BaseModel], data: Dict, defaults: Optional[Dict] = None) -> Dict:
+    """Coerce a parsed dict field by field and fill missing values from `defaults`"""
+    defaults = defaults or {}
+    coerced = {}
+    for name, field in schema.model_fields.items():
+        value = data.get(name)
+        if value is not None:
+            value = _coerce(field.annotation, value)
+        if value is None or (value == [] and name in defaults):
+            if name in defaults:
+                value = defaults[name]
+            elif not field.is_required():
+                continue
+            elif field.annotation in _EMPTY_VALUES:
+                # Keep the object usable, callers regenerate empty text they care about
+                value = _EMPTY_VALUES[field.annotation]
+            elif get_origin(field.annotation) in (list, List):
+                value = []
+        coerced[name] = value
+    return coerced
+
+
+def repair_structured_output(schema: Type[M], output: Any, defaults: Optional[Dict] = None,
+                             non_empty: Sequence[str] = ()) -> Optional[M]:
+    """
+    Turn the result of a `with_structured_output(schema, include_raw=True)` call (or an
+    already parsed dict) into a schema instance, repairing it locally when needed.
+    Fields named in `non_empty` must not come back empty, e.g. output truncated right
+    after `"sections": [` validates but has no body.
+    Returns None when the output cannot be salvaged.
+    """
+    result = data = None
+    if isinstance(output, dict) and "raw" in output and "parsed" in output:
+        if isinstance(output["parsed"], schema):
+            result = output["parsed"]
+        else:
+            data = raw_payload(output["raw"])
+    else:
+        data = output
+
+    if result is None:
+        if not isinstance(data, dict):
+            return None
+        try:
+            result = schema.model_validate(coerce_to_schema(schema, data, defaults))
+        except ValidationError as e:
+            print(f"    ⚠️ Could not repair {schema.__name__}: {e.error_count()} validation error(s)")
+            return None
+
+    empty = [name for name in non_empty if not getattr(result, name, None)]
+    if empty:
+        print(f"    ⚠️ Could not repair {schema.__name__}: empty {', '.join(empty)}")
+        return None
+    return result
+
+
+def word_count(text: str) -> int:
+    return len(re.findall(r"\w+", text or ""))
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Local similarity index over recently published articles. Titles, subtitles and summaries
+# are turned into hashed TF-IDF vectors (word unigrams and bigrams hashed into a fixed number
+# of buckets, so new articles never change the vocabulary) held in a NumPy matrix. The index
+# is cached on disk and refreshed incrementally from the store by createdAt.
+
+DEFAULT_INDEX_PATH = os.path.join(os.getenv("NEURAL_NEWS_DATA_DIR", ".data"), "archive_index.json")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "new", "of", "on", "or", "that", "the", "their", "this", "to", "was", "were", "will", "with",
+}
+
+
+def _features(text: str) -> List[str]:
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class ArchiveIndex:
+    """Hashed TF-IDF index over the published archive within a rolling window"""
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, window_days: int = 14, n_features: int = 4096):
+        self.index_path = index_path
+        self.window_days = window_days
+        self.n_features = n_features
+        self.documents: Dict[str, Dict] = {}
+        self.last_created_at: Optional[str] = None
+        self.ids: List[str] = []
+        self.vectors = np.zeros((0, n_features), dtype=np.float32)
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self._load()
+
+    # ========================================== PERSISTENCE ==========================================
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r") as f:
+                cached = json.load(f)
+            if cached.get("n_features") == self.n_features:
+                self.documents = cached["documents"]
+                self.last_created_at = cached["last_created_at"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"    ⚠️ Could not read archive index, rebuilding: {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "n_features": self.n_features,
+                "last_created_at": self.last_created_at,
+                "documents": self.documents,
+            }, f)
+        os.replace(tmp_path, self.index_path)
+
+    # ========================================== INDEXING ==========================================
+
+    def _term_counts(self, text: str) -> np.ndarray:
+        counts = np.zeros(self.n_features, dtype=np.float32)
+        for feature in _features(text):
+            counts[zlib.crc32(feature.encode()) % self.n_features] += 1
+        return counts
+
+    def _vectorize(self, counts: np.ndarray) -> np.ndarray:
+        """Sublinear TF times IDF, L2-normalized row-wise"""
+        weighted = np.log1p(counts) * self.idf
+        norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+        return weighted / np.maximum(norms, 1e-9)
+
+    def refresh(self):
+        """Pull articles created since the last refresh, drop ones that left the window and rebuild vectors"""
+        from agents.firestore_utils import get_recent_articles
+
+        date_from = (datetime.now(timezone.utc).date() - timedelta(days=self.window_days)).isoformat()
+        new_articles = get_recent_articles(date_from, created_after=self.last_created_at)
+
+        for article in new_articles:
+            self.documents[article["id"]] = {
+                "title": article.get("title", ""),
+                "date": article.get("date", ""),
+                "text": " ".join([article.get("title", ""), article.get("subtitle", ""), article.get("summary", "")]),
+            }
+            created_at = article.get("createdAt")
+            if created_at and (self.last_created_at is None or created_at > self.last_created_at):
+                self.last_created_at = created_at
+
+        self.documents = {doc_id: doc for doc_id, doc in self.documents.items() if doc["date"] >= date_from}
+        self._rebuild()
+        self._save()
+        print(f"    📚 Archive index: {len(self.ids)} articles ({len(new_articles)} new)")
+
+    def _rebuild(self):
+        self.ids = list(self.documents)
+        if not self.ids:
+            self.vectors = np.zeros((0, self.n_features), dtype=np.float32)
+            return
+        counts = np.stack([self._term_counts(self.documents[doc_id]["text"]) for doc_id in self.ids])
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(self.ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.vectors = self._vectorize(counts)
+
+    def most_similar(self, text: str) -> Optional[Tuple[str, float]]:
+        """(article id, cosine similarity) of the closest archived article"""
+        if not self.ids:
+            return None
+        similarities = self.vectors @ self._vectorize(self._term_counts(text))
+        best = int(np.argmax(similarities))
+        return self.ids[best], float(similarities[best])
+
+
+class TopicDeduplicator:
+    """Drops proposed topics we already covered and marks close ones as follow-ups"""
+
+    def __init__(self, index: Optional[ArchiveIndex] = None, drop_threshold: float = 0.6,
+                 follow_up_threshold: float = 0.35):
+        self.index = index or ArchiveIndex()
+        self.drop_threshold = drop_threshold
+        self.follow_up_threshold = follow_up_threshold
+
+    def filter(self, topics: List[Dict]) -> List[Dict]:
+        self.index.refresh()
+
+        kept = []
+        for topic in topics:
+            match = self.index.most_similar(f"{topic.get('title', '')} {topic.get('summary', '')}")
+            if match is None:
+                kept.append(topic)
+                continue
+
+            article_id, similarity = match
+            archived_title = self.index.documents[article_id]["title"]
+            if similarity >= self.drop_threshold:
+                print(f"        🗑️ Dropping '{topic.get('title', '')}' — {similarity:.2f} similar to '{archived_title}'")
+                continue
+            if similarity >= self.follow_up_threshold:
+                print(f"        🔗 '{topic.get('title', '')}' is a follow-up to '{archived_title}' ({similarity:.2f})")
+                topic["follow_up_of"] = {"id": article_id, "title": archived_title, "similarity": similarity}
+            kept.append(topic)
+
+        return kept
@@ -0,0 +1,360 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Durable queue of topic jobs shared by the coordinator (article_generation_node) and any
+# number of workers (python -m agents.worker). Workers lease a job for a limited time,
+# renew the lease while generating, and complete or fail it. A job whose lease expires
+# is handed to another worker; after max_attempts it is marked failed. Results stay in the
+# queue until the coordinator collects them, so articles that finish after it stopped waiting
+# are picked up by the next run.
+#
+# Job dicts: {"id", "run_id", "topic", "status", "attempts", "result", "error"}
+# status: pending | leased | done | failed
+
+DEFAULT_QUEUE_URL = "sqlite:///" + os.path.join(os.getenv("NEURAL_NEWS_DATA_DIR", ".data"), "topic_queue.db")
+
+TERMINAL_STATUSES = {"done", "failed"}
+
+
+class TopicQueue(ABC):
+    """Interface shared by the queue backends"""
+
+    @abstractmethod
+    def enqueue(self, run_id: str, topic: Dict, max_attempts: int = 3) -> str:
+        ...
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """Claim the next ready job, or None when the queue is empty"""
+
+    @abstractmethod
+    def extend(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Renew a lease. False if the worker no longer holds it."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """
+        Record the result. A worker that lost its lease still records it unless the job is
+        already done, the article has been generated and paid for either way.
+        """
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 30.0) -> bool:
+        """Put the job back for a retry, or mark it failed once out of attempts"""
+
+    @abstractmethod
+    def jobs(self, run_id: str) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def uncollected(self) -> List[Dict]:
+        """Done jobs of any run whose result the coordinator has not collected yet"""
+
+    @abstractmethod
+    def mark_collected(self, job_ids: List[str]):
+        ...
+
+    def wait_for_run(self, run_id: str, timeout: float, poll_interval: float = 5.0) -> List[Dict]:
+        """Block until every job of the run is done or failed, or the timeout passes"""
+        deadline = time.monotonic() + timeout
+        while True:
+            jobs = self.jobs(run_id)
+            finished = sum(1 for job in jobs if job["status"] in TERMINAL_STATUSES)
+            if finished == len(jobs) or time.monotonic() >= deadline:
+                return jobs
+            time.sleep(poll_interval)
+
+
+# ========================================== SQLITE BACKEND ==========================================
+
+class SQLiteTopicQueue(TopicQueue):
+    """Queue in a local SQLite database (WAL mode), shared by processes on one machine or volume"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    collected INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Queues created before results were collected explicitly
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "collected" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN collected INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_uncollected ON jobs (status, collected)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode, writes that must be atomic open their own BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict:
+        return {
+            "id": row["id"],
+            "run_id": row["run_id"],
+            "topic": json.loads(row["topic"]),
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+
+    def enqueue(self, run_id: str, topic: Dict, max_attempts: int = 3) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, run_id, topic, status, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?)",
+                (job_id, run_id, json.dumps(topic), max_attempts, now, now),
+            )
+        return job_id
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases of jobs that are out of attempts will never succeed
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired' "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now,),
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = 'pending' AND available_at <= ?) "
+                    "OR (status = 'leased' AND lease_expires < ?) ORDER BY created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (worker_id, now + lease_seconds, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        job = self._job(row)
+        job["status"] = "leased"
+        job["attempts"] += 1
+        return job
+
+    def extend(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL "
+                "WHERE id = ? AND status != 'done'",
+                (json.dumps(result), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 30.0) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET "
+                "status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "available_at = ?, error = ?, lease_owner = NULL "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time() + retry_delay, error, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def jobs(self, run_id: str) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE run_id = ? ORDER BY created_at", (run_id,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def uncollected(self) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'done' AND collected = 0 ORDER BY created_at"
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def mark_collected(self, job_ids: List[str]):
+        with self._connect() as conn:
+            conn.executemany("UPDATE jobs SET collected = 1 WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+
+# ========================================== REDIS BACKEND ==========================================
+
+# Reclaims expired leases and claims the oldest ready job atomically
+_REDIS_LEASE = """
+local prefix, now, expires, owner = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]), ARGV[3]
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. ':leased', '-inf', now)) do
+    redis.call('ZREM', prefix .. ':leased', id)
+    local job = prefix .. ':job:' .. id
+    if tonumber(redis.call('HGET', job, 'attempts')) >= tonumber(redis.call('HGET', job, 'max_attempts')) then
+        redis.call('HSET', job, 'status', 'failed', 'error', 'lease expired')
+    else
+        redis.call('HSET', job, 'status', 'pending')
+        redis.call('ZADD', prefix .. ':ready', now, id)
+    end
+end
+local ready = redis.call('ZRANGEBYSCORE', prefix .. ':ready', '-inf', now, 'LIMIT', 0, 1)
+if #ready == 0 then return false end
+local id = ready[1]
+redis.call('ZREM', prefix .. ':ready', id)
+redis.call('ZADD', prefix .. ':leased', expires, id)
+redis.call('HSET', prefix .. ':job:' .. id, 'status', 'leased', 'lease_owner', owner)
+redis.call('HINCRBY', prefix .. ':job:' .. id, 'attempts', 1)
+return id
+"""
+
+# Finishes a leased job if the caller still owns it, completions are recorded unless the job is
+# already done. ARGV: id, owner, action, value, now, retry_at, expires
+_REDIS_FINISH = """
+local prefix, id, owner, action = KEYS[1], ARGV[1], ARGV[2], ARGV[3]
+local job = prefix .. ':job:' .. id
+local status = redis.call('HGET', job, 'status')
+if action == 'complete' then
+    -- A worker that lost its lease still records its result unless the job is already done
+    if not status or status == 'done' then return 0 end
+    redis.call('ZREM', prefix .. ':leased', id)
+    redis.call('ZREM', prefix .. ':ready', id)
+    redis.call('HDEL', job, 'lease_owner', 'error')
+    redis.call('HSET', job, 'status', 'done', 'result', ARGV[4])
+    redis.call('SADD', prefix .. ':uncollected', id)
+    return 1
+end
+if status ~= 'leased' or redis.call('HGET', job, 'lease_owner') ~= owner then
+    return 0
+end
+if action == 'extend' then
+    redis.call('ZADD', prefix .. ':leased', tonumber(ARGV[7]), id)
+    return 1
+end
+redis.call('ZREM', prefix .. ':leased', id)
+redis.call('HDEL', job, 'lease_owner')
+if tonumber(redis.call('HGET', job, 'attempts')) >= tonumber(redis.call('HGET', job, 'max_attempts')) then
+    redis.call('HSET', job, 'status', 'failed', 'error', ARGV[4])
+else
+    redis.call('HSET', job, 'status', 'pending', 'error', ARGV[4])
+    redis.call('ZADD', prefix .. ':ready', tonumber(ARGV[6]), id)
+end
+return 1
+"""
+
+
+class RedisTopicQueue(TopicQueue):
+    """Queue in Redis for workers spread across machines. Requires `pip install redis`."""
+
+    def __init__(self, url: str, prefix: str = "neural_news:topics"):
+        import redis
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._lease_script = self.redis.register_script(_REDIS_LEASE)
+        self._finish_script = self.redis.register_script(_REDIS_FINISH)
+
+    def _job(self, job_id: str) -> Dict:
+        data = self.redis.hgetall(f"{self.prefix}:job:{job_id}")
+        return {
+            "id": job_id,
+            "run_id": data["run_id"],
+            "topic": json.loads(data["topic"]),
+            "status": data["status"],
+            "attempts": int(data["attempts"]),
+            "result": json.loads(data["result"]) if data.get("result") else None,
+            "error": data.get("error"),
+        }
+
+    def enqueue(self, run_id: str, topic: Dict, max_attempts: int = 3) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.hset(f"{self.prefix}:job:{job_id}", mapping={
+            "run_id": run_id,
+            "topic": json.dumps(topic),
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "created_at": now,
+        })
+        pipe.rpush(f"{self.prefix}:run:{run_id}", job_id)
+        pipe.zadd(f"{self.prefix}:ready", {job_id: now})
+        pipe.execute()
+        return job_id
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        job_id = self._lease_script(keys=[self.prefix], args=[now, now + lease_seconds, worker_id])
+        return self._job(job_id) if job_id else None
+
+    def _finish(self, job_id: str, worker_id: str, action: str, value: str = "", retry_delay: float = 0.0,
+                lease_seconds: float = 0.0) -> bool:
+        now = time.time()
+        return bool(self._finish_script(
+            keys=[self.prefix],
+            args=[job_id, worker_id, action, value, now, now + retry_delay, now + lease_seconds],
+        ))
+
+    def extend(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return self._finish(job_id, worker_id, "extend", lease_seconds=lease_seconds)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, "complete", json.dumps(result))
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 30.0) -> bool:
+        return self._finish(job_id, worker_id, "fail", error, retry_delay=retry_delay)
+
+    def jobs(self, run_id: str) -> List[Dict]:
+        return [self._job(job_id) for job_id in self.redis.lrange(f"{self.prefix}:run:{run_id}", 0, -1)]
+
+    def uncollected(self) -> List[Dict]:
+        return [self._job(job_id) for job_id in sorted(self.redis.smembers(f"{self.prefix}:uncollected"))]
+
+    def mark_collected(self, job_ids: List[str]):
+        if job_ids:
+            self.redis.srem(f"{self.prefix}:uncollected", *job_ids)
+
+
+def open_queue(url: str = DEFAULT_QUEUE_URL) -> TopicQueue:
+    """Open a queue from a URL: sqlite:///path/to/queue.db or redis://host:port/db"""
+    if url.startswith("sqlite:///"):
+        return SQLiteTopicQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisTopicQueue(url)
+    raise ValueError(f"Unsupported queue URL: {url}")
@@ -0,0 +1,101 @@
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from dotenv import load_dotenv, find_dotenv
+from agents.article_agent import ArticleAgent
+from agents.work_queue import DEFAULT_QUEUE_URL, TopicQueue, open_queue
+from agents.outbox import topic_article_id
+
+load_dotenv(find_dotenv())
+
+# Worker entry point for queued article generation. Start as many as the research model
+# and providers allow, on one machine (SQLite queue) or many (Redis queue):
+#
+#     python -m agents.worker --queue sqlite:///.data/topic_queue.db
+#     python -m agents.worker --queue redis://queue-host:6379/0
+
+
+def _keep_lease(queue: TopicQueue, job_id: str, worker_id: str, lease_seconds: float, stop: threading.Event):
+    """Renew the lease while the job is running so long generations are not handed to another worker"""
+    while not stop.wait(lease_seconds / 3):
+        if not queue.extend(job_id, worker_id, lease_seconds):
+            print(f"⚠️ Lost lease on job {job_id}")
+            return
+
+
+def process_job(queue: TopicQueue, agent: ArticleAgent, job: dict, worker_id: str, lease_seconds: float) -> bool:
+    """Generate the article for one leased job and record the outcome"""
+    print(f"🛠️ Job {job['id']} (attempt {job['attempts']}): {job['topic'].get('title', '')}")
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_lease, args=(queue, job["id"], worker_id, lease_seconds, stop), daemon=True
+    )
+    heartbeat.start()
+    try:
+        article_id = topic_article_id(job["topic"], str(datetime.now(timezone.utc).date().isoformat()))
+        article = agent.invoke(job["topic"], article_id=article_id)
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    if not article or not article.get("final_article"):
+        # Back off longer with every attempt
+        queue.fail(job["id"], worker_id, "article generation failed", retry_delay=60.0 * job["attempts"])
+        print(f"❌ Job {job['id']} failed")
+        return False
+
+    completed = queue.complete(job["id"], worker_id, {
+        "article_id": article_id,
+        "final_article": article["final_article"],
+        "published": article.get("published", False),
+        # Streaming workers write the article themselves, the coordinator must not write it again
+        "persisted": article.get("draft") is not None,
+        "stop_reason": article.get("stop_reason"),
+    })
+    print(f"✅ Job {job['id']} {'completed' if completed else 'was already completed by another worker'}")
+    return completed
+
+
+def run_worker(queue: TopicQueue, agent: ArticleAgent, worker_id: Optional[str] = None,
+               lease_seconds: float = 900.0, idle_sleep: float = 5.0, exit_when_empty: bool = False):
+    """Lease and process jobs until interrupted, or until the queue is empty with exit_when_empty"""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    print(f"🚀 Worker {worker_id} started")
+
+    while True:
+        job = queue.lease(worker_id, lease_seconds)
+        if job is None:
+            if exit_when_empty:
+                print("Queue empty, exiting")
+                return
+            time.sleep(idle_sleep)
+            continue
+        process_job(queue, agent, job, worker_id, lease_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued ArticleAgent jobs")
+    parser.add_argument("--queue", default=os.getenv("TOPIC_QUEUE_URL", DEFAULT_QUEUE_URL))
+    parser.add_argument("--worker-id")
+    parser.add_argument("--lease-seconds", type=float, default=900.0)
+    parser.add_argument("--exit-when-empty", action="store_true")
+    parser.add_argument("--stream-write", action="store_true", help="Persist and publish articles from the worker")
+    args = parser.parse_args()
+
+    openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
+    if not openrouter_api_key:
+        raise ValueError("Failed to load api key")
+
+    run_worker(
+        open_queue(args.queue),
+        ArticleAgent(api_key=openrouter_api_key, stream_write=args.stream_write),
+        worker_id=args.worker_id,
+        lease_seconds=args.lease_seconds,
+        exit_when_empty=args.exit_when_empty,
+    )
@@ -0,0 +1,10 @@
+from typing import Any, Dict
+
+
+def is_published(article_data: Dict[str, Any]) -> bool:
+    """
+    Whether an article document is served to readers. Streaming drafts that were never
+    finalized stay 'draft', articles written before statuses existed count as published.
+    Mirrors agents.firestore_utils.is_published, the back end does not import the agents.
+    """
+    return article_data.get('status', 'published') == 'published'
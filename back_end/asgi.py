@@ -0,0 +1,24 @@
+from quart import Quart
+from quart_cors import cors
+from back_end.routes.async_news import async_news_bp
+from back_end.routes.async_article import async_article_bp
+import os
+
+# Async serving mode: the same routes and response shapes as back_end.app, served over ASGI
+# with the async Firestore client so requests waiting on Firestore do not hold a thread.
+#
+#     uvicorn back_end.asgi:app --host 0.0.0.0 --port 5000
+
+def create_async_app():
+    app = Quart(__name__)
+
+    origins = os.getenv('CORS_ORIGINS', '')
+
+    app = cors(app, allow_origin=[origins])
+
+    app.register_blueprint(async_news_bp, url_prefix="/api")
+    app.register_blueprint(async_article_bp, url_prefix="/api")
+
+    return app
+
+app = create_async_app()
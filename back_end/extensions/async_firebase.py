@@ -0,0 +1,17 @@
+from google.cloud import firestore
+from google.oauth2 import service_account
+from back_end.extensions.firebase import cred_path
+
+# Async Firestore client for the ASGI app (back_end/asgi.py). It reuses the service account
+# found by back_end.extensions.firebase and is created lazily because its gRPC channel
+# binds to the event loop that first uses it.
+
+_async_db = None
+
+
+def get_async_db() -> firestore.AsyncClient:
+    global _async_db
+    if _async_db is None:
+        credentials = service_account.Credentials.from_service_account_file(cred_path)
+        _async_db = firestore.AsyncClient(project=credentials.project_id, credentials=credentials)
+    return _async_db
@@ -3,6 +3,7 @@ from firebase_admin import firestore
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional, Union
 from back_end.extensions.firebase import db
+from back_end.article_status import is_published
 
 article_bp = Blueprint('article', __name__, url_prefix='/api')
 
@@ -16,10 +17,12 @@ def get_article(article_id: str):
         article_ref = db.collection('articles').document(article_id)
         article_doc = article_ref.get()
         
-        if not article_doc.exists:
+        article_data: Dict[str, Any] = article_doc.to_dict() if article_doc.exists else None
+
+        # Unfinished streaming drafts are not served
+        if article_data is None or not is_published(article_data):
             return jsonify({'error': 'Article not found'}), 404
         
-        article_data: Dict[str, Any] = article_doc.to_dict()
         article_data['id'] = article_doc.id
         
         # Get the article content from the subcollection
@@ -0,0 +1,41 @@
+import asyncio
+from quart import Blueprint, jsonify
+from typing import Dict, Any
+from back_end.extensions.async_firebase import get_async_db
+from back_end.article_status import is_published
+
+async_article_bp = Blueprint('async_article', __name__)
+
+@async_article_bp.route('/articles/<article_id>', methods=['GET'])
+async def get_article(article_id: str):
+    """
+    Get a specific article by ID with its content
+    """
+    try:
+        article_ref = get_async_db().collection('articles').document(article_id)
+        content_ref = article_ref.collection('content').document('main')
+
+        # Fetch the article and its content body concurrently
+        article_doc, content_doc = await asyncio.gather(article_ref.get(), content_ref.get())
+
+        article_data: Dict[str, Any] = article_doc.to_dict() if article_doc.exists else None
+
+        # Unfinished streaming drafts are not served
+        if article_data is None or not is_published(article_data):
+            return jsonify({'error': 'Article not found'}), 404
+
+        article_data['id'] = article_doc.id
+
+        if content_doc.exists:
+            # The body field contains the array of content sections
+            article_data['content'] = content_doc.to_dict().get('body', [])
+        else:
+            article_data['content'] = []
+
+        return jsonify({
+            'success': True,
+            'article': article_data
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch article: {str(e)}'}), 500
@@ -0,0 +1,56 @@
+from quart import Blueprint, jsonify
+from google.cloud import firestore
+from datetime import datetime
+from back_end.extensions.async_firebase import get_async_db
+from back_end.article_status import is_published
+
+async_news_bp = Blueprint('async_news', __name__)
+
+@async_news_bp.route('/news', methods=['GET'])
+async def get_newsletter_dates():
+    """
+    Get all available newsletter dates with article counts
+    Returns: List of objects with date and count fields
+    """
+    try:
+        newsletter_dates_ref = get_async_db().collection('newsletter_dates')
+        docs = newsletter_dates_ref.order_by('date', direction=firestore.Query.DESCENDING).stream()
+
+        newsletter_dates = [doc.to_dict() async for doc in docs]
+
+        return jsonify(newsletter_dates), 200
+
+    except Exception as e:
+        print(f"Error fetching newsletter dates: {str(e)}")
+        return jsonify({'error': 'Failed to fetch newsletter dates'}), 500
+
+
+@async_news_bp.route('/news/<date>', methods=['GET'])
+async def get_news_by_date(date: str):
+    """
+    Get news articles for a specific date
+    Returns articles matching the new document structure
+    """
+    try:
+        # Validate date format
+        try:
+            datetime.strptime(date, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        query = get_async_db().collection('articles').where('date', '==', date)
+
+        articles = []
+        async for doc in query.stream():
+            article_data = doc.to_dict()
+            # Streaming drafts are only visible once published, older articles have no status
+            if not is_published(article_data):
+                continue
+            article_data['id'] = doc.id
+            articles.append(article_data)
+
+        return jsonify(articles), 200
+
+    except Exception as e:
+        print(f"Error fetching news for date {date}: {str(e)}")
+        return jsonify({'error': f'Failed to fetch news for date {date}'}), 500
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 import os
 from typing import List, Dict, Any
 from back_end.extensions.firebase import db
+from back_end.article_status import is_published
 
 news_bp = Blueprint('news', __name__)
 
@@ -54,6 +55,9 @@ def get_news_by_date(date: str):
         articles = []
         for doc in docs:
             article_data = doc.to_dict()
+            # Streaming drafts are only visible once published, older articles have no status
+            if not is_published(article_data):
+                continue
             article_data['id'] = doc.id
             articles.append(article_data)
         
@@ -0,0 +1,123 @@
+"""
+Compare parse CPU time and peak memory of the feed parser backends.
+
+Each backend runs in its own subprocess and peak memory is the process's maximum
+resident set size, so libxml2's native allocations are counted along with Python's.
+
+    python -m benchmarks.feed_parser_bench                      # synthetic ScienceDaily-sized feed
+    python -m benchmarks.feed_parser_bench --url https://www.sciencedaily.com/rss/all.xml
+    python -m benchmarks.feed_parser_bench --file feed.xml --repeat 10
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import requests
+from agents.feed_parser import parse_with_feedparser, parse_with_iterparse
+
+
+def synthetic_feed(items: int, body_words: int) -> bytes:
+    """RSS 2.0 feed with content:encoded bodies, newest entry first"""
+    now = datetime.now(timezone.utc)
+    body = " ".join(["lorem"] * body_words)
+    entries = []
+    for i in range(items):
+        published = format_datetime(now - timedelta(minutes=30 * i))
+        entries.append(
+            f"<item><title>Story {i}</title><link>https://example.com/{i}</link>"
+            f"<description>Summary of story {i}</description>"
+            f"<content:encoded><![CDATA[<p>{body}</p>]]></content:encoded>"
+            f"<category>science</category><pubDate>{published}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+        "<title>Benchmark</title>" + "".join(entries) + "</channel></rss>"
+    ).encode()
+
+
+def _max_rss() -> int:
+    """Peak resident set size of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_backend(backend: str, path: str, limit: int, hours: int, repeat: int):
+    """Child process: parse the saved feed `repeat` times and print the measurements as JSON"""
+    with open(path, "rb") as f:
+        data = f.read()
+    cutoff = datetime.now() - timedelta(hours=hours)
+    if backend == "fast":
+        parse = lambda: parse_with_iterparse(io.BytesIO(data), "bench", "science", cutoff, limit)
+    else:
+        parse = lambda: parse_with_feedparser(data, "bench", "science", cutoff, limit)
+
+    # Interpreter, imports and the feed bytes are the same for both backends
+    baseline = _max_rss()
+    cpu = []
+    count = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        count = len(parse())
+        cpu.append(time.process_time() - start)
+    print(json.dumps({"count": count, "cpu": cpu, "baseline": baseline, "peak": _max_rss()}))
+
+
+def measure(backend: str, path: str, args):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.feed_parser_bench", "--run", backend, "--file", path,
+         "--limit", str(args.limit), "--hours", str(args.hours), "--repeat", str(args.repeat)],
+        env={**os.environ, "PYTHONPATH": os.getcwd()}, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    cpu = sorted(result["cpu"])
+    print(f"{backend:<12} entries={result['count']:<4} cpu median={cpu[len(cpu) // 2] * 1000:8.1f} ms  "
+          f"min={cpu[0] * 1000:8.1f} ms  peak rss={result['peak'] / 1024 / 1024:7.2f} MiB  "
+          f"(+{(result['peak'] - result['baseline']) / 1024 / 1024:.2f} MiB over baseline)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Fetch a live feed once and benchmark on its bytes")
+    parser.add_argument("--file", help="Benchmark on a saved feed document")
+    parser.add_argument("--items", type=int, default=2000, help="Entries in the synthetic feed")
+    parser.add_argument("--body-words", type=int, default=400, help="Words per synthetic entry body")
+    parser.add_argument("--limit", type=int, default=20, help="Per-feed entry limit")
+    parser.add_argument("--hours", type=int, default=48, help="Cutoff window in hours")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--run", choices=["feedparser", "fast"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run_backend(args.run, args.file, args.limit, args.hours, args.repeat)
+
+    if args.url:
+        data = requests.get(args.url, timeout=30).content
+    elif args.file:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_feed(args.items, args.body_words)
+
+    print(f"feed size: {len(data) / 1024:.0f} KiB, limit={args.limit}, cutoff={args.hours}h, repeat={args.repeat}")
+
+    # Both backends parse the same saved bytes so network time is excluded
+    with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as f:
+        f.write(data)
+    try:
+        measure("feedparser", f.name, args)
+        measure("fast", f.name, args)
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
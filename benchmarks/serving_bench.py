@@ -0,0 +1,236 @@
+"""
+Compare the sync (Flask + gunicorn, 2 workers x 4 threads) and async (Quart + uvicorn,
+AsyncClient) serving modes under a slow datastore.
+
+Both servers run the real routes against an in-memory Firestore double that sleeps
+--delay seconds per read, so the numbers reflect how many requests each mode keeps in
+flight while waiting on I/O rather than Firestore itself.
+
+    python -m benchmarks.serving_bench --delay 0.2 --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import types
+
+SYNC_PORT = 5101
+ASYNC_PORT = 5102
+DATES = [f"2025-08-{day:02d}" for day in range(1, 29)]
+
+
+# ========================================== SLOW DATASTORE ==========================================
+
+def _dataset():
+    newsletter_dates = {date: {"date": date, "articleCount": 5, "createdAt": f"{date}T06:00:00+00:00"} for date in DATES}
+    articles = {}
+    for date in DATES:
+        for i in range(5):
+            articles[f"{date}-{i}"] = {"title": f"Article {i}", "subtitle": "Subtitle", "categories": ["Science"],
+                                       "sources": [], "date": date, "readTime": 300, "views": 0, "status": "published"}
+    body = [{"heading": f"Section {i}", "content": "word " * 300} for i in range(4)]
+    return newsletter_dates, articles, body
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class _Store:
+    """Query surface used by the routes, shared by the sync and async doubles"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.newsletter_dates, self.articles, self.body = _dataset()
+
+    def documents(self, path, filters):
+        if path == ("newsletter_dates",):
+            docs = sorted(self.newsletter_dates.items(), key=lambda item: item[0], reverse=True)
+        else:
+            docs = list(self.articles.items())
+        for field, value in filters:
+            docs = [(doc_id, data) for doc_id, data in docs if data.get(field) == value]
+        return [_Snapshot(doc_id, data) for doc_id, data in docs]
+
+    def document(self, path):
+        if len(path) == 4:
+            return _Snapshot(path[3], {"body": self.body} if path[1] in self.articles else None)
+        return _Snapshot(path[1], self.articles.get(path[1]))
+
+
+class _SyncRef:
+    def __init__(self, store, path, filters=()):
+        self.store, self.path, self.filters = store, path, filters
+
+    def collection(self, name):
+        return _SyncRef(self.store, self.path + (name,))
+
+    def document(self, doc_id):
+        return _SyncRef(self.store, self.path + (doc_id,))
+
+    def where(self, field, op, value):
+        return _SyncRef(self.store, self.path, self.filters + ((field, value),))
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def stream(self):
+        time.sleep(self.store.delay)
+        return iter(self.store.documents(self.path, self.filters))
+
+    def get(self):
+        time.sleep(self.store.delay)
+        return self.store.document(self.path)
+
+
+class _AsyncRef(_SyncRef):
+    def collection(self, name):
+        return _AsyncRef(self.store, self.path + (name,))
+
+    def document(self, doc_id):
+        return _AsyncRef(self.store, self.path + (doc_id,))
+
+    def where(self, field, op, value):
+        return _AsyncRef(self.store, self.path, self.filters + ((field, value),))
+
+    async def stream(self):
+        await asyncio.sleep(self.store.delay)
+        for snapshot in self.store.documents(self.path, self.filters):
+            yield snapshot
+
+    async def get(self):
+        await asyncio.sleep(self.store.delay)
+        return self.store.document(self.path)
+
+
+def _install_datastore(delay: float):
+    """Replace the Firestore extension modules before the routes import them"""
+    store = _Store(delay)
+    sync_module = types.ModuleType("back_end.extensions.firebase")
+    sync_module.db = _SyncRef(store, ())
+    sync_module.cred_path = None
+    async_module = types.ModuleType("back_end.extensions.async_firebase")
+    async_db = _AsyncRef(store, ())
+    async_module.get_async_db = lambda: async_db
+    sys.modules["back_end.extensions.firebase"] = sync_module
+    sys.modules["back_end.extensions.async_firebase"] = async_module
+
+
+# ========================================== SERVERS ==========================================
+
+def serve_sync(delay: float, port: int):
+    from gunicorn.app.base import BaseApplication
+
+    _install_datastore(delay)
+    from back_end import create_app
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in {"bind": f"127.0.0.1:{port}", "workers": 2, "threads": 4,
+                               "worker_class": "gthread", "loglevel": "warning"}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return create_app()
+
+    Server().run()
+
+
+def serve_async(delay: float, port: int):
+    import uvicorn
+
+    _install_datastore(delay)
+    from back_end.asgi import create_async_app
+
+    uvicorn.run(create_async_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+# ========================================== LOAD GENERATOR ==========================================
+
+async def _load(port: int, total: int, concurrency: int):
+    import httpx
+
+    paths = ["/api/news"] + [f"/api/news/{date}" for date in DATES] + [f"/api/articles/{DATES[0]}-{i}" for i in range(5)]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    return total / elapsed, pct(0.50), pct(0.95), pct(0.99), latencies[-1] * 1000, errors
+
+
+async def _wait_ready(port: int, timeout: float = 30.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(f"http://127.0.0.1:{port}/api/news")
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds per datastore read")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--serve", choices=["sync", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "sync":
+        return serve_sync(args.delay, args.port)
+    if args.serve == "async":
+        return serve_async(args.delay, args.port)
+
+    print(f"datastore delay={args.delay * 1000:.0f} ms, concurrency={args.concurrency}, requests={args.requests}")
+    for mode, port in (("sync", SYNC_PORT), ("async", ASYNC_PORT)):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serving_bench", "--serve", mode, "--port", str(port),
+             "--delay", str(args.delay)],
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+        try:
+            asyncio.run(_wait_ready(port))
+            rps, p50, p95, p99, worst, errors = asyncio.run(_load(port, args.requests, args.concurrency))
+            print(f"{mode:<6} {rps:8.1f} req/s  p50={p50:7.0f} ms  p95={p95:7.0f} ms  "
+                  f"p99={p99:7.0f} ms  max={worst:7.0f} ms  errors={errors}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()